@@ -0,0 +1,71 @@
+"""
+In-process cache shared by the API and storage modules
+"""
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class TTLCache:
+    """Dict-backed cache with per-entry expiry and a size cap
+    
+    Entries expire ``ttl`` seconds after they are set (never when ``ttl`` is
+    None). When the cap is reached the least recently used entries are evicted
+    first. The cap counts entries, or the total ``sizeof(value)`` of the
+    entries when ``sizeof`` is given.
+    """
+    
+    def __init__(self, max_size: int, ttl: Optional[float] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.size = 0
+        # key -> (expires_at or None, value, size); dicts keep insertion
+        # order, so the first key is the least recently used one
+        self._entries: Dict[Hashable, tuple] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key, or default if it is missing or expired"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            self.size -= entry[2]
+            return default
+        # Re-inserting moves the entry to the end, away from eviction
+        self._entries[key] = entry
+        return entry[1]
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value under key for ttl seconds (default: the cache's ttl)"""
+        self.pop(key)
+        size = self.sizeof(value) if self.sizeof else 1
+        if size > self.max_size:
+            return
+        while self._entries and self.size + size > self.max_size:
+            self.pop(next(iter(self._entries)))
+        
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, value, size)
+        self.size += size
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value, or default if it is missing or expired"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.size -= entry[2]
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+    
+    def clear(self):
+        """Remove every entry"""
+        self._entries.clear()
+        self.size = 0
@@ -2,27 +2,191 @@
 Database helper functions for Supabase
 """
 import os
+import json
+import asyncio
+import functools
 import uuid
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+import asyncpg
 from supabase_client import supabase_admin
 from postgrest.exceptions import APIError
+from cache import TTLCache
+
+# Direct Postgres connection for hot-path queries (falls back to PostgREST if unset)
+DATABASE_URL = os.environ.get("DATABASE_URL")
+DB_POOL_MIN_SIZE = 5
+DB_POOL_MAX_SIZE = 40
+# Per-connection prepared statement cache; set to 0 behind a transaction-mode
+# pgbouncer (e.g. the Supabase pooler on port 6543), which cannot keep them
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 1024))
+
+# Errors raised by either the PostgREST client or the asyncpg pool
+DB_ERRORS = (APIError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+# Caps in-flight database calls at the pool size so bursts queue here instead
+# of exhausting Postgres connections
+_db_semaphore = asyncio.Semaphore(DB_POOL_MAX_SIZE)
+
+def bounded(func):
+    """Run a database coroutine under the shared concurrency limit"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with _db_semaphore:
+            return await func(*args, **kwargs)
+    return wrapper
+
+# Explicit column lists for hot lookups (users skip password_hash, questions
+# skip the search_tsv full-text column)
+USER_COLUMNS = (
+    "id, username, email, university, faculty, department, is_admin, "
+    "last_question_at, last_answer_at, created_at, updated_at"
+)
+QUESTION_COLUMNS = (
+    "id, title, content, author_id, author_username, author_university, "
+    "author_faculty, author_department, category, created_at, updated_at, "
+    "view_count, answer_count, like_count"
+)
+
+# In-process cache for get_user_by_id (hit by every authenticated request)
+USER_CACHE_TTL = 30  # seconds
+USER_CACHE_MAX_SIZE = 10000
+
+# Username -> {id, username} for mention lookups (usernames never change)
+USERNAME_CACHE_TTL = 60  # seconds
+USERNAME_CACHE_MAX_SIZE = 4096
+
+def postgrest_quote(value: str) -> str:
+    """Double-quote a value for a PostgREST filter, escaping backslashes and quotes"""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+def question_cursor(question: Dict[str, Any]) -> str:
+    """Keyset cursor pointing just past a question: created_at and id"""
+    return f"{question['created_at']}_{question['id']}"
+
+def parse_question_cursor(cursor: str) -> tuple:
+    """Split a question cursor into (created_at, id); raises ValueError if malformed"""
+    created_at, _, last_id = cursor.partition("_")
+    datetime.fromisoformat(created_at)
+    return created_at, str(uuid.UUID(last_id))
+
+# Read-ahead for keyset get_questions calls: each fetch also loads the
+# following page and keeps it briefly so sequential browsing costs one round
+# trip per two pages; question writes drop it
+QUESTIONS_PREFETCH_TTL = 10  # seconds
+QUESTIONS_PREFETCH_MAX_SIZE = 1024
+
+# Leaderboard results per limit, shared by all requests in the TTL window
+LEADERBOARD_CACHE_TTL = 60  # seconds
+LEADERBOARD_CACHE_MAX_SIZE = 32
+
+# Question views are counted in memory and written in one batch per interval
+# instead of one UPDATE on the question row per page view
+VIEW_FLUSH_INTERVAL = 10  # seconds
 
 class Database:
     """Database operations using Supabase"""
     
     def __init__(self):
         self.db = supabase_admin
+        self.pool: Optional[asyncpg.Pool] = None
+        self._user_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL)
+        self._username_cache = TTLCache(USERNAME_CACHE_MAX_SIZE, USERNAME_CACHE_TTL)
+        self._questions_prefetch = TTLCache(QUESTIONS_PREFETCH_MAX_SIZE, QUESTIONS_PREFETCH_TTL)
+        self._pending_views: Dict[str, int] = {}
+        self._leaderboard_cache = TTLCache(LEADERBOARD_CACHE_MAX_SIZE, LEADERBOARD_CACHE_TTL)
+    
+    async def connect(self):
+        """Open the asyncpg connection pool (no-op without DATABASE_URL)"""
+        if DATABASE_URL and self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE
+            )
+    
+    async def close(self):
+        """Close the asyncpg connection pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+    
+    async def _fetch_json(self, query: str, *args) -> Any:
+        """Run a query returning a single json value and decode it
+        
+        Rows are serialized with row_to_json so they have the same shape
+        (string UUIDs and ISO timestamps) as PostgREST responses.
+        """
+        async with self.pool.acquire() as conn:
+            value = await conn.fetchval(query, *args)
+        return json.loads(value) if value else None
+    
+    async def _insert(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert a row through the pool and return it as a dict"""
+        columns = ", ".join(f'"{column}"' for column in data)
+        return await self._fetch_json(
+            f"""
+            WITH t AS (
+                INSERT INTO public.{table} ({columns})
+                SELECT {columns} FROM json_populate_record(NULL::public.{table}, $1::json)
+                RETURNING *
+            )
+            SELECT row_to_json(t) FROM t
+            """,
+            json.dumps(data)
+        )
+    
+    async def _insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several rows in one statement and return them as dicts"""
+        columns = ", ".join(f'"{column}"' for column in rows[0])
+        return await self._fetch_json(
+            f"""
+            WITH t AS (
+                INSERT INTO public.{table} ({columns})
+                SELECT {columns} FROM json_populate_recordset(NULL::public.{table}, $1::json)
+                RETURNING *
+            )
+            SELECT COALESCE(json_agg(t), '[]'::json) FROM t
+            """,
+            json.dumps(rows)
+        )
+    
+    async def _update(self, table: str, row_id: str, data: Dict[str, Any], columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Update a row through the pool and return the new version as a dict"""
+        targets = ", ".join(f'"{column}"' for column in data)
+        return await self._fetch_json(
+            f"""
+            WITH t AS (
+                UPDATE public.{table} SET ({targets}) = (
+                    SELECT {targets} FROM json_populate_record(NULL::public.{table}, $2::json)
+                )
+                WHERE id = $1
+                RETURNING {columns}
+            )
+            SELECT row_to_json(t) FROM t
+            """,
+            row_id, json.dumps(data)
+        )
+    
+    def invalidate_user_cache(self, user_id: str):
+        """Drop a cached user so the next lookup hits the database"""
+        self._user_cache.pop(user_id, None)
     
     # User Operations
+    @bounded
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user"""
         try:
+            if self.pool:
+                return await self._insert("users", user_data)
             result = self.db.table("users").insert(user_data).execute()
             return result.data[0] if result.data else None
-        except APIError as e:
+        except DB_ERRORS as e:
             raise Exception(f"Error creating user: {str(e)}")
     
+    @bounded
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         try:
@@ -31,6 +195,7 @@ class Database:
         except APIError:
             return None
     
+    @bounded
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
         try:
@@ -39,75 +204,225 @@ class Database:
         except APIError:
             return None
     
-    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user by ID"""
+    @bounded
+    async def get_users_by_usernames(self, usernames: List[str]) -> List[Dict[str, Any]]:
+        """Get the id and username of every user in the list with one query
+        
+        Found users are cached for USERNAME_CACHE_TTL seconds, so only the
+        usernames not seen recently are queried.
+        """
+        users = []
+        missing = []
+        for username in usernames:
+            cached = self._username_cache.get(username)
+            if cached:
+                users.append(cached)
+            else:
+                missing.append(username)
+        if not missing:
+            return users
+        
         try:
-            result = self.db.table("users").select("*").eq("id", user_id).execute()
-            return result.data[0] if result.data else None
+            if self.pool:
+                found = await self._fetch_json(
+                    """
+                    SELECT COALESCE(json_agg(u), '[]'::json)
+                    FROM (SELECT id, username FROM public.users WHERE username = ANY($1)) u
+                    """,
+                    missing
+                )
+            else:
+                result = self.db.table("users").select("id, username").in_("username", missing).execute()
+                found = result.data if result.data else []
+        except DB_ERRORS:
+            return users
+        
+        for user in found:
+            self._username_cache.set(user["username"], user)
+        return users + found
+    
+    @bounded
+    async def find_users_by_email_or_username(self, email: str, username: str) -> List[Dict[str, Any]]:
+        """Get users matching either the email or the username in one query"""
+        try:
+            result = self.db.table("users").select("email, username").or_(
+                f"email.eq.{postgrest_quote(email)},username.eq.{postgrest_quote(username)}"
+            ).execute()
+            return result.data if result.data else []
         except APIError:
+            return []
+    
+    @bounded
+    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user by ID (cached for USER_CACHE_TTL seconds)"""
+        cached = self._user_cache.get(user_id)
+        if cached:
+            return cached
+        
+        try:
+            if self.pool:
+                user = await self._fetch_json(
+                    f"SELECT row_to_json(u) FROM (SELECT {USER_COLUMNS} FROM public.users WHERE id = $1) u",
+                    user_id
+                )
+            else:
+                result = self.db.table("users").select(USER_COLUMNS).eq("id", user_id).execute()
+                user = result.data[0] if result.data else None
+        except DB_ERRORS:
             return None
+        
+        if user:
+            self._user_cache.set(user_id, user)
+        return user
     
+    @bounded
     async def update_user_last_question(self, user_id: str):
         """Update user's last question timestamp"""
         try:
-            self.db.table("users").update({
-                "last_question_at": datetime.utcnow().isoformat()
-            }).eq("id", user_id).execute()
-        except APIError:
+            if self.pool:
+                async with self.pool.acquire() as conn:
+                    await conn.execute("UPDATE public.users SET last_question_at = NOW() WHERE id = $1", user_id)
+            else:
+                self.db.table("users").update({
+                    "last_question_at": datetime.utcnow().isoformat()
+                }).eq("id", user_id).execute()
+        except DB_ERRORS:
             pass
+        finally:
+            self.invalidate_user_cache(user_id)
     
+    @bounded
     async def update_user_last_answer(self, user_id: str):
         """Update user's last answer timestamp"""
         try:
-            self.db.table("users").update({
-                "last_answer_at": datetime.utcnow().isoformat()
-            }).eq("id", user_id).execute()
-        except APIError:
+            if self.pool:
+                async with self.pool.acquire() as conn:
+                    await conn.execute("UPDATE public.users SET last_answer_at = NOW() WHERE id = $1", user_id)
+            else:
+                self.db.table("users").update({
+                    "last_answer_at": datetime.utcnow().isoformat()
+                }).eq("id", user_id).execute()
+        except DB_ERRORS:
             pass
+        finally:
+            self.invalidate_user_cache(user_id)
+    
+    @bounded
+    async def can_perform_action(self, user_id: str, action_type: str) -> bool:
+        """Check the 2 minute rate limit for an action in the database"""
+        try:
+            if self.pool:
+                async with self.pool.acquire() as conn:
+                    allowed = await conn.fetchval("SELECT can_perform($1, $2)", user_id, action_type)
+            else:
+                result = self.db.rpc("can_perform", {"uid": user_id, "action": action_type}).execute()
+                allowed = result.data
+        except DB_ERRORS:
+            return False
+        return bool(allowed)
     
     # Question Operations
+    @bounded
     async def create_question(self, question_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new question"""
         try:
+            if self.pool:
+                return await self._insert("questions", question_data)
             result = self.db.table("questions").insert(question_data).execute()
             return result.data[0] if result.data else None
-        except APIError as e:
+        except DB_ERRORS as e:
             raise Exception(f"Error creating question: {str(e)}")
+        finally:
+            # Prefetched pages no longer match what the database would return
+            self._questions_prefetch.clear()
     
+    @bounded
     async def get_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
         """Get question by ID"""
         try:
-            result = self.db.table("questions").select("*").eq("id", question_id).execute()
+            if self.pool:
+                return await self._fetch_json(
+                    f"SELECT row_to_json(q) FROM (SELECT {QUESTION_COLUMNS} FROM public.questions WHERE id = $1) q",
+                    question_id
+                )
+            result = self.db.table("questions").select(QUESTION_COLUMNS).eq("id", question_id).execute()
             return result.data[0] if result.data else None
-        except APIError:
+        except DB_ERRORS:
             return None
     
+    @bounded
     async def get_questions(self, limit: int = 50, offset: int = 0, 
-                           category: str = None, search: str = None) -> List[Dict[str, Any]]:
-        """Get questions with optional filtering"""
+                           category: str = None, search: str = None,
+                           cursor: str = None) -> tuple:
+        """Get questions with optional filtering
+        
+        Returns ``(questions, next_cursor)``. When ``cursor`` (a previous
+        ``next_cursor``) is given, keyset pagination on ``(created_at, id)``
+        is used and ``offset`` is ignored. Raises ValueError for a malformed
+        cursor.
+        """
+        if cursor:
+            created_at, last_id = parse_question_cursor(cursor)
+            
+            prefetched = self._questions_prefetch.pop((category, search, limit, cursor))
+            if prefetched:
+                return prefetched
+        
         try:
-            query = self.db.table("questions").select("*")
+            query = self.db.table("questions").select(QUESTION_COLUMNS)
             
             if category:
                 query = query.eq("category", category)
             
             if search:
-                query = query.or_(f"title.ilike.%{search}%,content.ilike.%{search}%")
+                query = query.text_search(
+                    "search_tsv", search, {"config": "turkish", "type": "websearch"}
+                )
             
-            result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
-            return result.data if result.data else []
+            query = query.order("created_at", desc=True).order("id", desc=True)
+            
+            if cursor:
+                # Rows sharing the boundary timestamp are told apart by id
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{last_id})'
+                )
+                # The following page plus one row to tell whether it is the last
+                result = query.limit(2 * limit + 1).execute()
+            else:
+                # One extra row tells whether there is a next page
+                result = query.range(offset, offset + limit).execute()
         except APIError:
-            return []
+            return [], None
+        
+        rows = result.data if result.data else []
+        page, next_page = rows[:limit], rows[limit:2 * limit]
+        next_cursor = question_cursor(page[-1]) if next_page else None
+        if cursor and next_page:
+            # Stash the next page under the cursor the client will send
+            following = question_cursor(next_page[-1]) if len(rows) > 2 * limit else None
+            self._questions_prefetch.set((category, search, limit, next_cursor), (next_page, following))
+        return page, next_cursor
     
-    async def update_question(self, question_id: str, update_data: Dict[str, Any]) -> bool:
-        """Update a question"""
+    @bounded
+    async def update_question(self, question_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a question and return the updated row"""
         try:
             update_data["updated_at"] = datetime.utcnow().isoformat()
-            self.db.table("questions").update(update_data).eq("id", question_id).execute()
-            return True
-        except APIError:
-            return False
+            if self.pool:
+                return await self._update("questions", question_id, update_data, QUESTION_COLUMNS)
+            result = self.db.table("questions").update(update_data).eq("id", question_id).execute()
+            if not result.data:
+                return None
+            question = result.data[0]
+            question.pop("search_tsv", None)
+            return question
+        except DB_ERRORS:
+            return None
+        finally:
+            self._questions_prefetch.clear()
     
+    @bounded
     async def delete_question(self, question_id: str) -> bool:
         """Delete a question"""
         try:
@@ -115,37 +430,99 @@ class Database:
             return True
         except APIError:
             return False
+        finally:
+            self._questions_prefetch.clear()
+    
+    def increment_question_views(self, question_id: str):
+        """Count a question view (written by the next flush_views)"""
+        self._pending_views[question_id] = self._pending_views.get(question_id, 0) + 1
     
-    async def increment_question_views(self, question_id: str):
-        """Increment question view count"""
+    @bounded
+    async def flush_views(self):
+        """Write the buffered view counts to the database in one call"""
+        if not self._pending_views:
+            return
+        pending, self._pending_views = self._pending_views, {}
+        flushed = False
+        
         try:
-            question = await self.get_question_by_id(question_id)
-            if question:
-                self.db.table("questions").update({
-                    "view_count": question.get("view_count", 0) + 1
-                }).eq("id", question_id).execute()
-        except APIError:
-            pass
+            if self.pool:
+                async with self.pool.acquire() as conn:
+                    await conn.execute(
+                        "SELECT add_views($1::uuid[], $2::int[])",
+                        list(pending), list(pending.values())
+                    )
+            else:
+                self.db.rpc("add_views", {
+                    "qids": list(pending),
+                    "counts": list(pending.values())
+                }).execute()
+            flushed = True
+        except DB_ERRORS as e:
+            print(f"Error flushing views: {str(e)}")
+        finally:
+            if not flushed:
+                # Keep the counts for the next attempt, also when the flush is cancelled
+                for question_id, count in pending.items():
+                    self._pending_views[question_id] = self._pending_views.get(question_id, 0) + count
+    
+    async def flush_views_periodically(self):
+        """Flush buffered view counts every VIEW_FLUSH_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(VIEW_FLUSH_INTERVAL)
+            await self.flush_views()
+    
+    @bounded
+    async def get_question_with_answers(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """Count a view and return the question with its answers"""
+        try:
+            # Question and answers come back from one get_question_detail call
+            if self.pool:
+                detail = await self._fetch_json("SELECT get_question_detail($1)", question_id)
+            else:
+                result = self.db.rpc("get_question_detail", {"qid": question_id}).execute()
+                detail = result.data
+        except DB_ERRORS:
+            return None
+        
+        if detail:
+            # Include views from this worker that are not flushed yet
+            self.increment_question_views(question_id)
+            detail["question"]["view_count"] += self._pending_views[question_id]
+        return detail
     
     # Answer Operations
+    @bounded
     async def create_answer(self, answer_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new answer"""
         try:
+            if self.pool:
+                return await self._insert("answers", answer_data)
             result = self.db.table("answers").insert(answer_data).execute()
             return result.data[0] if result.data else None
-        except APIError as e:
+        except DB_ERRORS as e:
             raise Exception(f"Error creating answer: {str(e)}")
     
+    @bounded
     async def get_answers_by_question(self, question_id: str) -> List[Dict[str, Any]]:
         """Get all answers for a question"""
         try:
+            if self.pool:
+                return await self._fetch_json(
+                    """
+                    SELECT COALESCE(json_agg(a ORDER BY a.created_at), '[]'::json)
+                    FROM public.answers a WHERE a.question_id = $1
+                    """,
+                    question_id
+                )
             result = self.db.table("answers").select("*").eq(
                 "question_id", question_id
             ).order("created_at", desc=False).execute()
             return result.data if result.data else []
-        except APIError:
+        except DB_ERRORS:
             return []
     
+    @bounded
     async def get_answer_by_id(self, answer_id: str) -> Optional[Dict[str, Any]]:
         """Get answer by ID"""
         try:
@@ -154,15 +531,19 @@ class Database:
         except APIError:
             return None
     
-    async def update_answer(self, answer_id: str, update_data: Dict[str, Any]) -> bool:
-        """Update an answer"""
+    @bounded
+    async def update_answer(self, answer_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an answer and return the updated row"""
         try:
             update_data["updated_at"] = datetime.utcnow().isoformat()
-            self.db.table("answers").update(update_data).eq("id", answer_id).execute()
-            return True
-        except APIError:
-            return False
+            if self.pool:
+                return await self._update("answers", answer_id, update_data)
+            result = self.db.table("answers").update(update_data).eq("id", answer_id).execute()
+            return result.data[0] if result.data else None
+        except DB_ERRORS:
+            return None
     
+    @bounded
     async def delete_answer(self, answer_id: str) -> bool:
         """Delete an answer"""
         try:
@@ -172,25 +553,55 @@ class Database:
             return False
     
     # Notification Operations
+    @bounded
     async def create_notification(self, notification_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new notification"""
         try:
+            if self.pool:
+                return await self._insert("notifications", notification_data)
             result = self.db.table("notifications").insert(notification_data).execute()
             return result.data[0] if result.data else None
-        except APIError as e:
+        except DB_ERRORS as e:
             print(f"Error creating notification: {str(e)}")
             return None
     
+    @bounded
+    async def create_notifications(self, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several notifications with a single insert"""
+        if not notifications:
+            return []
+        try:
+            if self.pool:
+                return await self._insert_many("notifications", notifications)
+            result = self.db.table("notifications").insert(notifications).execute()
+            return result.data if result.data else []
+        except DB_ERRORS as e:
+            print(f"Error creating notifications: {str(e)}")
+            return []
+    
+    @bounded
     async def get_user_notifications(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get user's notifications"""
         try:
+            if self.pool:
+                return await self._fetch_json(
+                    """
+                    SELECT COALESCE(json_agg(n ORDER BY n.created_at DESC), '[]'::json)
+                    FROM (
+                        SELECT * FROM public.notifications
+                        WHERE user_id = $1 ORDER BY created_at DESC LIMIT $2
+                    ) n
+                    """,
+                    user_id, limit
+                )
             result = self.db.table("notifications").select("*").eq(
                 "user_id", user_id
             ).order("created_at", desc=True).limit(limit).execute()
             return result.data if result.data else []
-        except APIError:
+        except DB_ERRORS:
             return []
     
+    @bounded
     async def mark_notification_read(self, notification_id: str) -> bool:
         """Mark notification as read"""
         try:
@@ -202,141 +613,58 @@ class Database:
             return False
     
     # Like Operations
+    @bounded
     async def toggle_question_like(self, question_id: str, user_id: str) -> bool:
         """Toggle question like"""
         try:
-            # Check if already liked
-            result = self.db.table("question_likes").select("*").eq(
-                "question_id", question_id
-            ).eq("user_id", user_id).execute()
-            
-            if result.data:
-                # Unlike
-                self.db.table("question_likes").delete().eq(
-                    "question_id", question_id
-                ).eq("user_id", user_id).execute()
-                
-                # Decrement like count
-                question = await self.get_question_by_id(question_id)
-                if question:
-                    self.db.table("questions").update({
-                        "like_count": max(0, question.get("like_count", 0) - 1)
-                    }).eq("id", question_id).execute()
-                return False
-            else:
-                # Like
-                self.db.table("question_likes").insert({
-                    "question_id": question_id,
-                    "user_id": user_id
-                }).execute()
-                
-                # Increment like count
-                question = await self.get_question_by_id(question_id)
-                if question:
-                    self.db.table("questions").update({
-                        "like_count": question.get("like_count", 0) + 1
-                    }).eq("id", question_id).execute()
-                return True
-        except APIError:
+            # Existence check, insert/delete and counter update run in toggle_like
+            if self.pool:
+                async with self.pool.acquire() as conn:
+                    return await conn.fetchval("SELECT toggle_like($1, $2)", question_id, user_id)
+            result = self.db.rpc("toggle_like", {"qid": question_id, "uid": user_id}).execute()
+            return bool(result.data)
+        except DB_ERRORS:
             return False
     
     # Leaderboard
+    @bounded
     async def get_leaderboard(self, limit: int = 7) -> List[Dict[str, Any]]:
-        """Get leaderboard - top users by question and answer count"""
+        """Get leaderboard - top users by question and answer count
+        
+        Results are cached for LEADERBOARD_CACHE_TTL seconds per limit.
+        """
+        cached = self._leaderboard_cache.get(limit)
+        if cached is not None:
+            return cached
+        
         try:
-            # Get all users
-            users_result = self.db.table("users").select(
-                "id, username, university, faculty, department"
-            ).execute()
-            
-            if not users_result.data:
-                return []
-            
-            leaderboard = []
-            for user in users_result.data:
-                user_id = user["id"]
-                
-                # Count questions
-                q_result = self.db.table("questions").select(
-                    "id", count="exact"
-                ).eq("author_id", user_id).execute()
-                question_count = q_result.count if q_result.count else 0
-                
-                # Count answers
-                a_result = self.db.table("answers").select(
-                    "id", count="exact"
-                ).eq("author_id", user_id).execute()
-                answer_count = a_result.count if a_result.count else 0
-                
-                total_contributions = question_count + answer_count
-                
-                if total_contributions > 0:
-                    leaderboard.append({
-                        "username": user["username"],
-                        "university": user["university"],
-                        "faculty": user["faculty"],
-                        "department": user["department"],
-                        "question_count": question_count,
-                        "answer_count": answer_count,
-                        "total_contributions": total_contributions
-                    })
-            
-            # Sort by total contributions, then by username
-            leaderboard.sort(key=lambda x: (-x["total_contributions"], x["username"]))
-            
-            # Return top 7
-            return leaderboard[:limit]
-        except APIError as e:
+            # Counting, sorting and limiting happen in the get_leaderboard SQL function
+            if self.pool:
+                leaderboard = await self._fetch_json(
+                    """
+                    SELECT COALESCE(json_agg(l ORDER BY l.total_contributions DESC, l.username), '[]'::json)
+                    FROM get_leaderboard($1) l
+                    """,
+                    limit
+                )
+            else:
+                result = self.db.rpc("get_leaderboard", {"lim": limit}).execute()
+                leaderboard = result.data if result.data else []
+        except DB_ERRORS as e:
             print(f"Error getting leaderboard: {str(e)}")
             return []
+        
+        self._leaderboard_cache.set(limit, leaderboard)
+        return leaderboard
     
     # User Profile
+    @bounded
     async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get complete user profile with stats"""
         try:
-            user = await self.get_user_by_id(user_id)
-            if not user:
-                return None
-            
-            # Get question count
-            q_result = self.db.table("questions").select("id", count="exact").eq(
-                "author_id", user_id
-            ).execute()
-            question_count = q_result.count if q_result.count else 0
-            
-            # Get answer count
-            a_result = self.db.table("answers").select("id", count="exact").eq(
-                "author_id", user_id
-            ).execute()
-            answer_count = a_result.count if a_result.count else 0
-            
-            # Get recent questions
-            recent_questions = await self.get_questions(limit=5, offset=0)
-            recent_questions = [q for q in recent_questions if q["author_id"] == user_id][:5]
-            
-            # Get recent answers
-            a_recent = self.db.table("answers").select("*").eq(
-                "author_id", user_id
-            ).order("created_at", desc=True).limit(5).execute()
-            recent_answers = a_recent.data if a_recent.data else []
-            
-            return {
-                "user": {
-                    "id": user["id"],
-                    "username": user["username"],
-                    "email": user["email"],
-                    "university": user["university"],
-                    "faculty": user["faculty"],
-                    "department": user["department"],
-                    "created_at": user["created_at"]
-                },
-                "stats": {
-                    "question_count": question_count,
-                    "answer_count": answer_count
-                },
-                "recent_questions": recent_questions,
-                "recent_answers": recent_answers
-            }
+            # User, counts and recent activity come back from one get_user_profile RPC
+            result = self.db.rpc("get_user_profile", {"uid": user_id}).execute()
+            return result.data if result.data else None
         except APIError:
             return None
 
@@ -2,23 +2,29 @@
 UniSoruyor.com - Supabase Backend
 Modern, modular backend with Supabase integration
 """
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, status
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Response, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, EmailStr, Field
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import jwt
+import asyncio
+import hashlib
 import os
+import time
 import uuid
 import re
-import json
+import orjson
+from contextlib import suppress
 
 # Local imports
 from dotenv import load_dotenv
 from database import db
+from cache import TTLCache
 from supabase_client import supabase_admin
 from storage import storage
 
@@ -26,11 +32,26 @@ load_dotenv()
 
 # Security
 security = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-here")
 SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+JWT_CACHE_MAX_SIZE = 50000
+
+# CORS: comma-separated origin allowlist ("*" allows any origin); browsers may
+# reuse a preflight answer for CORS_MAX_AGE seconds instead of repeating it
+CORS_ORIGINS = [
+    origin.strip() for origin in os.environ.get("CORS_ORIGINS", "*").split(",") if origin.strip()
+]
+# Credentials only for an explicit allowlist: with "*" Starlette would echo any
+# Origin back on credentialed requests (API auth uses the Authorization header)
+CORS_ALLOW_CREDENTIALS = "*" not in CORS_ORIGINS
+CORS_MAX_AGE = 7200
+
+# Rate limiting
+RATE_LIMIT_SECONDS = 120
+RATE_LIMIT_CACHE_MAX_SIZE = 50000
 
 # =========================================
 # Pydantic Models
@@ -104,24 +125,59 @@ PROFANITY_PATTERNS = [
     (r'(o[\W_]*r[\W_]*o[\W_]*s[\W_]*p[\W_]*u)', 'orospu'),
 ]
 
+# Compiled once at import: all words in a single alternation (longest first so
+# the most specific word is reported) and all patterns as one named-group regex.
+# Word hits must start a word: Turkish inflects with suffixes, so "sikerim" still
+# matches while benign words that merely contain a short entry ("kitap" -> "it",
+# "hadi" -> "adi") do not.
+# Each regex starts with a lookahead on the possible first letters, a cheap
+# prefilter that skips most positions of clean text before the alternation runs.
+_PROFANITY_WORD_STARTS = "".join(sorted({word.lower()[0] for word in PROFANITY_WORDS}))
+_PROFANITY_PATTERN_STARTS = "".join(sorted({
+    pattern.removeprefix(r"\b").lstrip("(")[0] for pattern, _ in PROFANITY_PATTERNS
+}))
+_PROFANITY_WORDS_RE = re.compile(
+    r"(?=[" + re.escape(_PROFANITY_WORD_STARTS) + r"])(?<!\w)(?:" + "|".join(
+        re.escape(word.lower()) for word in sorted(PROFANITY_WORDS, key=len, reverse=True)
+    ) + ")"
+)
+_PROFANITY_PATTERNS_RE = re.compile(
+    r"(?=[" + re.escape(_PROFANITY_PATTERN_STARTS) + r"])(?:" + "|".join(
+        f"(?P<p{i}>{pattern})" for i, (pattern, _) in enumerate(PROFANITY_PATTERNS)
+    ) + ")",
+    re.IGNORECASE
+)
+_PROFANITY_PATTERN_WORDS = {f"p{i}": word for i, (_, word) in enumerate(PROFANITY_PATTERNS)}
+
 def contains_profanity(text: str) -> tuple:
     """Check if text contains profanity"""
     text_lower = text.lower()
-    
-    for word in PROFANITY_WORDS:
-        if word.lower() in text_lower:
-            return True, word
-    
-    for pattern, word in PROFANITY_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            return True, word
-    
+
+    match = _PROFANITY_WORDS_RE.search(text_lower)
+    if match:
+        return True, match.group()
+
+    match = _PROFANITY_PATTERNS_RE.search(text_lower)
+    if match:
+        return True, _PROFANITY_PATTERN_WORDS[match.lastgroup]
+
     return False, ""
 
+# Texts longer than this are scanned in a worker thread so the event loop
+# keeps serving other requests during the scan
+PROFANITY_THREAD_THRESHOLD = 2048
+
+async def check_profanity(text: str) -> tuple:
+    """contains_profanity for request handlers, off the event loop for long texts"""
+    if len(text) > PROFANITY_THREAD_THRESHOLD:
+        return await asyncio.to_thread(contains_profanity, text)
+    return contains_profanity(text)
+
+_MENTION_RE = re.compile(r'@(\w+)')
+
 def extract_mentions(content: str) -> List[str]:
-    """Extract @username mentions from content"""
-    mentions = re.findall(r'@(\w+)', content)
-    return list(set(mentions))
+    """Extract @username mentions from content (unique, in order of appearance)"""
+    return list(dict.fromkeys(_MENTION_RE.findall(content)))
 
 # =========================================
 # Authentication Helpers
@@ -143,11 +199,30 @@ def get_password_hash(password: str) -> str:
     """Hash password"""
     return pwd_context.hash(password)
 
+# Verified against when the login user does not exist, so a miss costs the
+# same bcrypt work as a wrong password and does not leak account existence
+_DUMMY_PASSWORD_HASH = get_password_hash(uuid.uuid4().hex)
+
+# Verified token payloads, kept until the token's own expiry
+_jwt_cache = TTLCache(JWT_CACHE_MAX_SIZE)
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing the result for tokens seen before"""
+    cached = _jwt_cache.get(token)
+    if cached:
+        return cached
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _jwt_cache.set(token, payload, ttl=expires_in)
+    return payload
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get current authenticated user from JWT token"""
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -171,30 +246,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 # Rate Limiting Helper
 # =========================================
 
+# (user_id, action_type) pairs that posted through this worker in the last
+# RATE_LIMIT_SECONDS
+_recent_actions = TTLCache(RATE_LIMIT_CACHE_MAX_SIZE, RATE_LIMIT_SECONDS)
+
 async def check_rate_limit(user_id: str, action_type: str = "question") -> bool:
     """Check if user can perform action (simple rate limiting)"""
-    user = await db.get_user_by_id(user_id)
-    if not user:
+    # Users who just posted through this worker are rejected without a DB round-trip
+    if (user_id, action_type) in _recent_actions:
         return False
     
-    last_action_field = f"last_{action_type}_at"
-    last_action = user.get(last_action_field)
-    
-    if last_action:
-        # Parse datetime
-        if isinstance(last_action, str):
-            last_action_dt = datetime.fromisoformat(last_action.replace('Z', '+00:00'))
-        else:
-            last_action_dt = last_action
-        
-        # Check if 2 minutes have passed
-        now = datetime.utcnow()
-        time_diff = (now - last_action_dt.replace(tzinfo=None)).total_seconds()
-        
-        if time_diff < 120:  # 2 minutes
-            return False
-    
-    return True
+    # Time comparison runs in SQL (can_perform) against the stored timestamp
+    return await db.can_perform_action(user_id, action_type)
+
+def record_action(user_id: str, action_type: str):
+    """Remember a successful post for the local rate limit check"""
+    _recent_actions.set((user_id, action_type), True)
 
 # =========================================
 # Initialize FastAPI
@@ -203,18 +270,66 @@ async def check_rate_limit(user_id: str, action_type: str = "question") -> bool:
 app = FastAPI(
     title="UniSoruyor.com API",
     description="Türkiye'nin en büyük üniversite öğrenci topluluğu - Supabase Backend",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=ORJSONResponse
 )
 
+@app.on_event("startup")
+async def startup_event():
+    """Open the database connection pool and start the view counter flush"""
+    await db.connect()
+    app.state.view_flush_task = asyncio.create_task(db.flush_views_periodically())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write pending view counts and close the database connection pool"""
+    app.state.view_flush_task.cancel()
+    # Let a flush that was in progress hand its counts back before the final one
+    with suppress(asyncio.CancelledError):
+        await app.state.view_flush_task
+    await db.flush_views()
+    await db.close()
+
+# Largest accepted upload request: the 20MB file limit plus multipart overhead
+UPLOAD_MAX_REQUEST_BYTES = 21 * 1024 * 1024
+
+class UploadSizeLimitMiddleware:
+    """Reject uploads by Content-Length before the multipart body is read"""
+    
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/upload/"):
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > self.max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": "Dosya boyutu 20MB'dan küçük olmalıdır"}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# Added before CORS so rejected uploads still get CORS headers; the per-file
+# limits are enforced again in read_upload
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=UPLOAD_MAX_REQUEST_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+    max_age=CORS_MAX_AGE,
 )
 
+# Compress larger JSON payloads (question lists, leaderboard)
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # =========================================
 # Health Check
 # =========================================
@@ -250,28 +365,26 @@ async def register(user_data: UserCreate):
             detail=f"Kullanıcı adı uygunsuz kelime içeriyor: '{found_word}'"
         )
     
-    # Check if email already exists
-    existing_email = await db.get_user_by_email(user_data.email)
-    if existing_email:
+    # Check if email or username already exists while the password is hashed
+    # in a worker thread (listed first so the thread starts before the lookup)
+    password_hash, existing_users = await asyncio.gather(
+        asyncio.to_thread(get_password_hash, user_data.password),
+        db.find_users_by_email_or_username(user_data.email, user_data.username)
+    )
+    if any(u["email"] == user_data.email for u in existing_users):
         raise HTTPException(
             status_code=400,
             detail="Bu e-posta adresi zaten kullanılıyor"
         )
     
-    # Check if username already exists
-    existing_username = await db.get_user_by_username(user_data.username)
-    if existing_username:
+    if any(u["username"] == user_data.username for u in existing_users):
         raise HTTPException(
             status_code=400,
             detail="Bu kullanıcı adı zaten kullanılıyor"
         )
     
-    # Create user
-    user_id = str(uuid.uuid4())
-    password_hash = get_password_hash(user_data.password)
-    
+    # Create user (id is generated by the database)
     new_user = {
-        "id": user_id,
         "username": user_data.username,
         "email": user_data.email,
         "university": user_data.university,
@@ -288,7 +401,7 @@ async def register(user_data: UserCreate):
             raise HTTPException(status_code=500, detail="Kullanıcı oluşturulamadı")
         
         # Create access token
-        access_token = create_access_token(data={"sub": user_id})
+        access_token = create_access_token(data={"sub": created_user["id"]})
         
         user_response = UserResponse(
             id=created_user["id"],
@@ -317,14 +430,12 @@ async def login(user_credentials: UserLogin):
     if not user:
         user = await db.get_user_by_username(user_credentials.email_or_username)
     
-    if not user:
-        raise HTTPException(
-            status_code=401,
-            detail="Mail adresi/kullanıcı adı veya şifre hatalı"
-        )
-    
-    # Verify password
-    if not verify_password(user_credentials.password, user["password_hash"]):
+    # Verify password off the event loop (always, even for unknown users)
+    password_hash = user["password_hash"] if user else _DUMMY_PASSWORD_HASH
+    password_ok = await asyncio.to_thread(
+        verify_password, user_credentials.password, password_hash
+    )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=401,
             detail="Mail adresi/kullanıcı adı veya şifre hatalı"
@@ -369,24 +480,22 @@ async def create_question(
         )
     
     # Check for profanity
-    title_has_profanity, found_word = contains_profanity(question_data.title)
+    title_has_profanity, found_word = await check_profanity(question_data.title)
     if title_has_profanity:
         raise HTTPException(
             status_code=400,
             detail=f"Başlık uygunsuz kelime içeriyor: '{found_word}'"
         )
     
-    content_has_profanity, found_word = contains_profanity(question_data.content)
+    content_has_profanity, found_word = await check_profanity(question_data.content)
     if content_has_profanity:
         raise HTTPException(
             status_code=400,
             detail=f"İçerik uygunsuz kelime içeriyor: '{found_word}'"
         )
     
-    # Create question
-    question_id = str(uuid.uuid4())
+    # Create question (id is generated by the database)
     new_question = {
-        "id": question_id,
         "title": question_data.title,
         "content": question_data.content,
         "author_id": current_user["id"],
@@ -407,6 +516,7 @@ async def create_question(
             raise HTTPException(status_code=500, detail="Soru oluşturulamadı")
         
         # Update user's last question time
+        record_action(current_user["id"], "question")
         await db.update_user_last_question(current_user["id"])
         
         return created_question
@@ -415,40 +525,45 @@ async def create_question(
 
 @app.get("/api/questions")
 async def get_questions(
-    limit: int = 50,
-    offset: int = 0,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     category: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
-    """Get all questions with optional filtering"""
+    """Get all questions with optional filtering
+    
+    The body stays a plain list; the cursor for the following page is sent
+    in the ``X-Next-Cursor`` header (absent on the last page). Pass it back as
+    ``cursor`` to fetch the next page without OFFSET scanning.
+    """
     try:
-        questions = await db.get_questions(
+        questions, next_cursor = await db.get_questions(
             limit=limit,
             offset=offset,
             category=category,
-            search=search
+            search=search,
+            cursor=cursor
         )
-        return questions
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return questions
 
 @app.get("/api/questions/{question_id}")
 async def get_question(question_id: str):
     """Get a single question by ID"""
-    question = await db.get_question_by_id(question_id)
-    if not question:
+    # Counts the view and returns {"question", "answers"}
+    question_detail = await db.get_question_with_answers(question_id)
+    if not question_detail:
         raise HTTPException(status_code=404, detail="Soru bulunamadı")
     
-    # Increment view count
-    await db.increment_question_views(question_id)
-    
-    # Get answers
-    answers = await db.get_answers_by_question(question_id)
-    
-    return {
-        "question": question,
-        "answers": answers
-    }
+    return question_detail
 
 @app.put("/api/questions/{question_id}")
 async def update_question(
@@ -467,7 +582,7 @@ async def update_question(
     
     # Check for profanity if updating
     if question_update.title:
-        title_has_profanity, found_word = contains_profanity(question_update.title)
+        title_has_profanity, found_word = await check_profanity(question_update.title)
         if title_has_profanity:
             raise HTTPException(
                 status_code=400,
@@ -475,7 +590,7 @@ async def update_question(
             )
     
     if question_update.content:
-        content_has_profanity, found_word = contains_profanity(question_update.content)
+        content_has_profanity, found_word = await check_profanity(question_update.content)
         if content_has_profanity:
             raise HTTPException(
                 status_code=400,
@@ -489,11 +604,11 @@ async def update_question(
     if question_update.content:
         update_data["content"] = question_update.content
     
-    success = await db.update_question(question_id, update_data)
-    if not success:
+    # The update returns the new row, so no second lookup is needed
+    updated_question = await db.update_question(question_id, update_data)
+    if not updated_question:
         raise HTTPException(status_code=500, detail="Soru güncellenemedi")
     
-    updated_question = await db.get_question_by_id(question_id)
     return updated_question
 
 @app.delete("/api/questions/{question_id}")
@@ -535,7 +650,7 @@ async def create_answer(
         )
     
     # Check for profanity
-    content_has_profanity, found_word = contains_profanity(answer_data.content)
+    content_has_profanity, found_word = await check_profanity(answer_data.content)
     if content_has_profanity:
         raise HTTPException(
             status_code=400,
@@ -550,15 +665,13 @@ async def create_answer(
     # Extract mentions
     mentions = extract_mentions(answer_data.content)
     
-    # Create answer
-    answer_id = str(uuid.uuid4())
+    # Create answer (id is generated by the database)
     new_answer = {
-        "id": answer_id,
         "question_id": answer_data.question_id,
         "content": answer_data.content,
         "author_id": current_user["id"],
         "author_username": current_user["username"],
-        "mentioned_users": json.dumps(mentions) if mentions else None,
+        "mentioned_users": mentions or None,
         "parent_answer_id": answer_data.parent_answer_id,
         "created_at": datetime.utcnow().isoformat(),
         "is_accepted": False,
@@ -566,17 +679,22 @@ async def create_answer(
     }
     
     try:
-        created_answer = await db.create_answer(new_answer)
+        # Mentioned users are looked up while the answer is being inserted
+        created_answer, mentioned_users = await asyncio.gather(
+            db.create_answer(new_answer),
+            db.get_users_by_usernames(mentions)
+        )
         if not created_answer:
             raise HTTPException(status_code=500, detail="Cevap oluşturulamadı")
         
-        # Update user's last answer time
-        await db.update_user_last_answer(current_user["id"])
+        record_action(current_user["id"], "answer")
+        answer_id = created_answer["id"]
+        
+        notifications = []
         
-        # Create notification for question author
+        # Notification for question author
         if question["author_id"] != current_user["id"]:
-            notification_data = {
-                "id": str(uuid.uuid4()),
+            notifications.append({
                 "user_id": question["author_id"],
                 "type": "answer",
                 "title": "Sorunuza yeni cevap",
@@ -587,15 +705,12 @@ async def create_answer(
                 "from_username": current_user["username"],
                 "is_read": False,
                 "created_at": datetime.utcnow().isoformat()
-            }
-            await db.create_notification(notification_data)
+            })
         
-        # Create notifications for mentioned users
-        for mention in mentions:
-            mentioned_user = await db.get_user_by_username(mention)
-            if mentioned_user and mentioned_user["id"] != current_user["id"]:
-                notification_data = {
-                    "id": str(uuid.uuid4()),
+        # Notifications for mentioned users
+        for mentioned_user in mentioned_users:
+            if mentioned_user["id"] != current_user["id"]:
+                notifications.append({
                     "user_id": mentioned_user["id"],
                     "type": "mention",
                     "title": "Bir cevapta etiketlendiniz",
@@ -606,8 +721,13 @@ async def create_answer(
                     "from_username": current_user["username"],
                     "is_read": False,
                     "created_at": datetime.utcnow().isoformat()
-                }
-                await db.create_notification(notification_data)
+                })
+        
+        # Update user's last answer time and insert all notifications together
+        await asyncio.gather(
+            db.update_user_last_answer(current_user["id"]),
+            db.create_notifications(notifications)
+        )
         
         return created_answer
     except Exception as e:
@@ -635,18 +755,17 @@ async def update_answer(
         raise HTTPException(status_code=403, detail="Bu cevabı düzenleme yetkiniz yok")
     
     # Check for profanity
-    content_has_profanity, found_word = contains_profanity(answer_update.content)
+    content_has_profanity, found_word = await check_profanity(answer_update.content)
     if content_has_profanity:
         raise HTTPException(
             status_code=400,
             detail=f"İçerik uygunsuz kelime içeriyor: '{found_word}'"
         )
     
-    success = await db.update_answer(answer_id, {"content": answer_update.content})
-    if not success:
+    updated_answer = await db.update_answer(answer_id, {"content": answer_update.content})
+    if not updated_answer:
         raise HTTPException(status_code=500, detail="Cevap güncellenemedi")
     
-    updated_answer = await db.get_answer_by_id(answer_id)
     return updated_answer
 
 @app.delete("/api/answers/{answer_id}")
@@ -734,88 +853,128 @@ async def get_user_profile(user_id: str):
 # Static Data Endpoints
 # =========================================
 
+# Static payloads are serialized once at import and served as raw bytes
+STATIC_CACHE_MAX_AGE = 86400  # seconds
+
+CATEGORIES = {
+    "Mühendislik Fakültesi": [
+        "Bilgisayar Mühendisliği", "Makine Mühendisliği", "Elektrik Mühendisliği",
+        "İnşaat Mühendisliği", "Endüstri Mühendisliği", "Kimya Mühendisliği",
+        "Çevre Mühendisliği", "Jeoloji Mühendisliği"
+    ],
+    "Tıp Fakültesi": [
+        "Tıp", "Hemşirelik", "Odyoloji", "Fizyoterapi"
+    ],
+    "Hukuk Fakültesi": [
+        "Hukuk"
+    ],
+    "İktisadi ve İdari Bilimler Fakültesi": [
+        "İşletme", "İktisat", "Maliye", "Kamu Yönetimi", "Uluslararası İlişkiler"
+    ],
+    "Fen Edebiyat Fakültesi": [
+        "Matematik", "Fizik", "Kimya", "Biyoloji", "Tarih", "Coğrafya", "Türk Dili ve Edebiyatı"
+    ],
+    "Eğitim Fakültesi": [
+        "İlköğretim Öğretmenliği", "Okul Öncesi Öğretmenliği", "PDR", "Rehberlik"
+    ],
+    "Mimarlık Fakültesi": [
+        "Mimarlık", "İç Mimarlık", "Şehir ve Bölge Planlama"
+    ],
+    "İletişim Fakültesi": [
+        "Gazetecilik", "Halkla İlişkiler", "Radyo TV Sinema"
+    ],
+    "Dersler": [
+        "Matematik I", "Matematik II", "Fizik I", "Fizik II", "Kimya I", "Kimya II",
+        "Diferansiyel Denklemler", "Lineer Cebir", "Olasılık ve İstatistik",
+        "Programlama I", "Programlama II", "Veri Yapıları", "Algoritmalar",
+        "Veritabanı Sistemleri", "İşletim Sistemleri", "Bilgisayar Ağları",
+        "Yapay Zeka", "Makine Öğrenmesi", "Web Programlama",
+        "Mobil Programlama", "Yazılım Mühendisliği", "Yazılım Testi",
+        "Bilgisayar Grafiği", "Gömülü Sistemler"
+    ]
+}
+
+UNIVERSITIES = [
+    # Istanbul Universities
+    "Boğaziçi Üniversitesi", "İstanbul Teknik Üniversitesi", "İstanbul Üniversitesi",
+    "Marmara Üniversitesi", "Yıldız Teknik Üniversitesi", "Galatasaray Üniversitesi",
+    "Koç Üniversitesi", "Sabancı Üniversitesi", "Bahçeşehir Üniversitesi",
+    
+    # Ankara Universities
+    "Hacettepe Üniversitesi", "Ankara Üniversitesi", "Orta Doğu Teknik Üniversitesi (ODTÜ)",
+    "Gazi Üniversitesi", "Bilkent Üniversitesi", "TOBB Ekonomi ve Teknoloji Üniversitesi",
+    
+    # Izmir Universities
+    "Ege Üniversitesi", "Dokuz Eylül Üniversitesi", "İzmir Yüksek Teknoloji Enstitüsü",
+    
+    # Other Major Cities
+    "Çukurova Üniversitesi", "Akdeniz Üniversitesi", "Anadolu Üniversitesi",
+    "Atatürk Üniversitesi", "Erciyes Üniversitesi", "Karadeniz Teknik Üniversitesi",
+    "Selçuk Üniversitesi", "Ondokuz Mayıs Üniversitesi", "Uludağ Üniversitesi"
+]
+
+FACULTIES = [
+    "Mühendislik Fakültesi", "Tıp Fakültesi", "Eğitim Fakültesi",
+    "İktisadi ve İdari Bilimler Fakültesi", "Hukuk Fakültesi",
+    "Fen Edebiyat Fakültesi", "Mimarlık Fakültesi", "Güzel Sanatlar Fakültesi",
+    "İletişim Fakültesi", "Spor Bilimleri Fakültesi", "Ziraat Fakültesi",
+    "Veteriner Fakültesi", "Diş Hekimliği Fakültesi", "Eczacılık Fakültesi",
+    "Sağlık Bilimleri Fakültesi", "Meslek Yüksekokulu"
+]
+
+def _static_payload(data: Any) -> tuple:
+    """Serialize static data once and derive its ETag"""
+    body = orjson.dumps(data)
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+_CATEGORIES_PAYLOAD = _static_payload(CATEGORIES)
+_UNIVERSITIES_PAYLOAD = _static_payload({"universities": sorted(UNIVERSITIES)})
+_FACULTIES_PAYLOAD = _static_payload({"faculties": sorted(FACULTIES)})
+
+def static_json_response(request: Request, payload: tuple) -> Response:
+    """Return a pre-serialized payload, or 304 if the client already has it"""
+    body, etag = payload
+    headers = {"Cache-Control": f"public, max-age={STATIC_CACHE_MAX_AGE}", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all categories"""
-    categories = {
-        "Mühendislik Fakültesi": [
-            "Bilgisayar Mühendisliği", "Makine Mühendisliği", "Elektrik Mühendisliği",
-            "İnşaat Mühendisliği", "Endüstri Mühendisliği", "Kimya Mühendisliği",
-            "Çevre Mühendisliği", "Jeoloji Mühendisliği"
-        ],
-        "Tıp Fakültesi": [
-            "Tıp", "Hemşirelik", "Odyoloji", "Fizyoterapi"
-        ],
-        "Hukuk Fakültesi": [
-            "Hukuk"
-        ],
-        "İktisadi ve İdari Bilimler Fakültesi": [
-            "İşletme", "İktisat", "Maliye", "Kamu Yönetimi", "Uluslararası İlişkiler"
-        ],
-        "Fen Edebiyat Fakültesi": [
-            "Matematik", "Fizik", "Kimya", "Biyoloji", "Tarih", "Coğrafya", "Türk Dili ve Edebiyatı"
-        ],
-        "Eğitim Fakültesi": [
-            "İlköğretim Öğretmenliği", "Okul Öncesi Öğretmenliği", "PDR", "Rehberlik"
-        ],
-        "Mimarlık Fakültesi": [
-            "Mimarlık", "İç Mimarlık", "Şehir ve Bölge Planlama"
-        ],
-        "İletişim Fakültesi": [
-            "Gazetecilik", "Halkla İlişkiler", "Radyo TV Sinema"
-        ],
-        "Dersler": [
-            "Matematik I", "Matematik II", "Fizik I", "Fizik II", "Kimya I", "Kimya II",
-            "Diferansiyel Denklemler", "Lineer Cebir", "Olasılık ve İstatistik",
-            "Programlama I", "Programlama II", "Veri Yapıları", "Algoritmalar",
-            "Veritabanı Sistemleri", "İşletim Sistemleri", "Bilgisayar Ağları",
-            "Yapay Zeka", "Makine Öğrenmesi", "Web Programlama",
-            "Mobil Programlama", "Yazılım Mühendisliği", "Yazılım Testi",
-            "Bilgisayar Grafiği", "Gömülü Sistemler"
-        ]
-    }
-    return categories
+    return static_json_response(request, _CATEGORIES_PAYLOAD)
 
 @app.get("/api/universities")
-async def get_universities():
+async def get_universities(request: Request):
     """Get all universities"""
-    universities = [
-        # Istanbul Universities
-        "Boğaziçi Üniversitesi", "İstanbul Teknik Üniversitesi", "İstanbul Üniversitesi",
-        "Marmara Üniversitesi", "Yıldız Teknik Üniversitesi", "Galatasaray Üniversitesi",
-        "Koç Üniversitesi", "Sabancı Üniversitesi", "Bahçeşehir Üniversitesi",
-        
-        # Ankara Universities
-        "Hacettepe Üniversitesi", "Ankara Üniversitesi", "Orta Doğu Teknik Üniversitesi (ODTÜ)",
-        "Gazi Üniversitesi", "Bilkent Üniversitesi", "TOBB Ekonomi ve Teknoloji Üniversitesi",
-        
-        # Izmir Universities
-        "Ege Üniversitesi", "Dokuz Eylül Üniversitesi", "İzmir Yüksek Teknoloji Enstitüsü",
-        
-        # Other Major Cities
-        "Çukurova Üniversitesi", "Akdeniz Üniversitesi", "Anadolu Üniversitesi",
-        "Atatürk Üniversitesi", "Erciyes Üniversitesi", "Karadeniz Teknik Üniversitesi",
-        "Selçuk Üniversitesi", "Ondokuz Mayıs Üniversitesi", "Uludağ Üniversitesi"
-    ]
-    return {"universities": sorted(universities)}
+    return static_json_response(request, _UNIVERSITIES_PAYLOAD)
 
 @app.get("/api/faculties")
-async def get_faculties():
+async def get_faculties(request: Request):
     """Get all faculties"""
-    faculties = [
-        "Mühendislik Fakültesi", "Tıp Fakültesi", "Eğitim Fakültesi",
-        "İktisadi ve İdari Bilimler Fakültesi", "Hukuk Fakültesi",
-        "Fen Edebiyat Fakültesi", "Mimarlık Fakültesi", "Güzel Sanatlar Fakültesi",
-        "İletişim Fakültesi", "Spor Bilimleri Fakültesi", "Ziraat Fakültesi",
-        "Veteriner Fakültesi", "Diş Hekimliği Fakültesi", "Eczacılık Fakültesi",
-        "Sağlık Bilimleri Fakültesi", "Meslek Yüksekokulu"
-    ]
-    return {"faculties": sorted(faculties)}
+    return static_json_response(request, _FACULTIES_PAYLOAD)
 
 # =========================================
 # File Upload Endpoints
 # =========================================
 
+async def read_upload(file: UploadFile, max_mb: int) -> bytes:
+    """Read an uploaded file after checking its size without loading it"""
+    # Multipart parsing already spooled the body, so the size is known up front
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+    
+    if size > max_mb * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dosya boyutu {max_mb}MB'dan küçük olmalıdır"
+        )
+    
+    return await file.read()
+
 @app.post("/api/upload/avatar")
 async def upload_avatar(
     file: UploadFile = File(...),
@@ -830,12 +989,7 @@ async def upload_avatar(
         )
     
     # Validate file size (5MB max)
-    file_content = await file.read()
-    if len(file_content) > 5 * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail="Dosya boyutu 5MB'dan küçük olmalıdır"
-        )
+    file_content = await read_upload(file, 5)
     
     # Upload to Supabase Storage
     result = await storage.upload_avatar(
@@ -864,12 +1018,7 @@ async def upload_question_attachment(
 ):
     """Upload question attachment"""
     # Validate file size (20MB max)
-    file_content = await file.read()
-    if len(file_content) > 20 * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail="Dosya boyutu 20MB'dan küçük olmalıdır"
-        )
+    file_content = await read_upload(file, 20)
     
     # Upload to Supabase Storage
     result = await storage.upload_question_attachment(
@@ -924,12 +1073,7 @@ async def upload_answer_attachment(
 ):
     """Upload answer attachment"""
     # Validate file size (20MB max)
-    file_content = await file.read()
-    if len(file_content) > 20 * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail="Dosya boyutu 20MB'dan küçük olmalıdır"
-        )
+    file_content = await read_upload(file, 20)
     
     # Upload to Supabase Storage
     result = await storage.upload_answer_attachment(
@@ -1,20 +1,26 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr, Field
-from passlib.context import CryptContext
+import bcrypt
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict
 import jwt
+import hashlib
+import mimetypes
 import os
-import uuid
+import time
 import re
-import json
-import aiomysql
+import orjson
+import asyncmy
+from asyncmy.cursors import DictCursor
+from asyncmy.errors import DataError, IntegrityError
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from ulid import ULID
+from cache import TTLCache
 
 # Environment
 from dotenv import load_dotenv
@@ -22,34 +28,89 @@ load_dotenv()
 
 # Security
 security = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt work runs via asyncio.to_thread so it does not block the event loop
+BCRYPT_ROUNDS = 10
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+JWT_CACHE_MAX_SIZE = 50000
 
-# Database connection (direct connection)
-
-@asynccontextmanager
-async def get_db_connection():
-    # Direct connection (bypass pool issues)
-    connection = await aiomysql.connect(
+# CORS: comma-separated origin allowlist ("*" allows any origin); browsers may
+# reuse a preflight answer for CORS_MAX_AGE seconds instead of repeating it
+CORS_ORIGINS = [
+    origin.strip() for origin in os.environ.get("CORS_ORIGINS", "*").split(",") if origin.strip()
+]
+# Credentials only for an explicit allowlist: with "*" Starlette would echo any
+# Origin back on credentialed requests (API auth uses the Authorization header)
+CORS_ALLOW_CREDENTIALS = "*" not in CORS_ORIGINS
+CORS_MAX_AGE = 7200
+
+# Database connection pool (opened on startup, shared by all requests)
+DB_POOL_MIN_SIZE = 10
+DB_POOL_MAX_SIZE = 50
+db_pool: Optional[asyncmy.Pool] = None
+
+async def init_db_pool():
+    """Open the MySQL connection pool"""
+    global db_pool
+    db_pool = await asyncmy.create_pool(
         host=os.environ.get("DB_HOST", "localhost"),
         port=int(os.environ.get("DB_PORT", 3306)),
         user=os.environ.get("DB_USER", "root"),
         password=os.environ.get("DB_PASSWORD", ""),
         db=os.environ.get("DB_NAME", "unisoruyor"),
         charset='utf8mb4',
-        autocommit=True
+        autocommit=True,
+        minsize=DB_POOL_MIN_SIZE,
+        maxsize=DB_POOL_MAX_SIZE,
+        pool_recycle=3600  # Reconnect before MySQL's wait_timeout drops idle connections
     )
-    try:
-        async with connection.cursor(aiomysql.DictCursor) as cursor:
+
+async def close_db_pool():
+    """Close the MySQL connection pool"""
+    if db_pool is not None:
+        db_pool.close()
+        await db_pool.wait_closed()
+
+@asynccontextmanager
+async def get_db_connection():
+    async with db_pool.acquire() as connection:
+        async with connection.cursor(DictCursor) as cursor:
             yield cursor
-    finally:
-        connection.close()
+
+async def fetch_one(query: str, args=None) -> Optional[dict]:
+    """Run a query on its own pooled connection and return the first row"""
+    async with get_db_connection() as cursor:
+        await cursor.execute(query, args)
+        return await cursor.fetchone()
+
+async def fetch_all(query: str, args=None) -> list:
+    """Run a query on its own pooled connection and return all rows"""
+    async with get_db_connection() as cursor:
+        await cursor.execute(query, args)
+        return await cursor.fetchall()
+
+@asynccontextmanager
+async def get_db_transaction():
+    """Like get_db_connection, but commits the statements together or not at all"""
+    async with db_pool.acquire() as connection:
+        await connection.begin()
+        try:
+            async with connection.cursor(DictCursor) as cursor:
+                yield cursor
+        except BaseException:
+            await connection.rollback()
+            raise
+        await connection.commit()
+
+def new_id() -> str:
+    """Return a new primary key; ULIDs are time-ordered, so inserts append to
+    the end of the InnoDB primary key instead of splitting random pages"""
+    return str(ULID())
 
 # Models
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     username: str
     email: str
     university: str
@@ -95,7 +156,7 @@ class Token(BaseModel):
     user: UserResponse
 
 class FileUpload(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     filename: str
     original_filename: str
     file_path: str
@@ -105,7 +166,7 @@ class FileUpload(BaseModel):
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class Question(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: str
     content: str
     author_id: str
@@ -128,7 +189,7 @@ class QuestionCreate(BaseModel):
     category: str
 
 class Notification(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str  # Who receives the notification
     type: str  # "answer", "reply", "mention"
     title: str
@@ -141,7 +202,7 @@ class Notification(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class Answer(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     question_id: str
     content: str
     author_id: str
@@ -158,7 +219,7 @@ class AnswerCreate(BaseModel):
     content: str
 
 class Comment(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     parent_id: str  # Question or Answer ID
     parent_type: str  # "question" or "answer"
     content: str
@@ -176,6 +237,16 @@ class PaginationInfo(BaseModel):
     has_prev: bool
     has_next: bool
 
+# Password utility functions
+def get_password_hash(password: str) -> str:
+    """Hash password"""
+    # bcrypt only uses the first 72 bytes of a password
+    return bcrypt.hashpw(password.encode()[:72], bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash"""
+    return bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+
 # JWT utility functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -188,7 +259,81 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Columns of the User model, selected explicitly instead of SELECT *.
+# get_current_user reads them by primary key, which InnoDB answers from the
+# clustered index leaf without a second lookup
+USER_COLUMNS = (
+    "id, username, email, university, faculty, department, password_hash, is_admin, "
+    "is_suspended, suspend_until, suspend_reason, is_muted, mute_until, "
+    "last_question_at, last_answer_at, created_at"
+)
+
+# Users loaded by get_current_user, reused briefly across requests;
+# writes to a user row invalidate its entry
+USER_CACHE_TTL = 30  # seconds
+USER_CACHE_MAX_SIZE = 10000
+_user_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL)
+USER_BOOL_FIELDS = ("is_admin", "is_suspended", "is_muted")
+
+# Verified token payloads, kept until the token's own expiry
+_jwt_cache = TTLCache(JWT_CACHE_MAX_SIZE)
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing the result for tokens seen before"""
+    cached = _jwt_cache.get(token)
+    if cached:
+        return cached
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _jwt_cache.set(token, payload, ttl=expires_in)
+    return payload
+
+async def delete_user_row(cursor, user_id: str):
+    """Delete a user, taking their cascaded likes off the questions' like_count"""
+    await cursor.execute("""
+        UPDATE questions q 
+        JOIN question_likes ql ON ql.question_id = q.id 
+        SET q.like_count = q.like_count - 1 
+        WHERE ql.user_id = %s
+    """, (user_id,))
+    await cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: set = set()
+
+def invalidate_user_cache(user_id: str):
+    """Drop a cached user so the next request reads it from the database"""
+    _user_cache.pop(user_id, None)
+
+def run_in_background(coro):
+    """Schedule a coroutine without making the current request wait for it"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def clear_expired_restrictions(user_id: str, now: datetime):
+    """Clear expired suspension/mute columns in a single UPDATE"""
+    # MySQL re-checks each expiry, so a restriction re-applied in the meantime
+    # is kept; suspend_until/mute_until are assigned last because later
+    # assignments see the earlier ones' new values
+    try:
+        async with get_db_connection() as cursor:
+            await cursor.execute("""
+                UPDATE users 
+                SET is_suspended = IF(suspend_until <= %(now)s, FALSE, is_suspended),
+                    suspend_reason = IF(suspend_until <= %(now)s, NULL, suspend_reason),
+                    suspend_until = IF(suspend_until <= %(now)s, NULL, suspend_until),
+                    is_muted = IF(mute_until <= %(now)s, FALSE, is_muted),
+                    mute_until = IF(mute_until <= %(now)s, NULL, mute_until)
+                WHERE id = %(user_id)s AND (suspend_until <= %(now)s OR mute_until <= %(now)s)
+            """, {"user_id": user_id, "now": now})
+    except Exception as e:
+        print(f"❌ Error clearing expired restrictions for {user_id}: {e}")
+    invalidate_user_cache(user_id)
+
+async def load_current_user(credentials: HTTPAuthorizationCredentials) -> User:
     token = credentials.credentials
     credentials_exception = HTTPException(
         status_code=401,
@@ -197,100 +342,127 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
     except jwt.PyJWTError:
         raise credentials_exception
     
-    async with get_db_connection() as cursor:
-        await cursor.execute("""
-            SELECT *, is_suspended, suspend_until, suspend_reason 
-            FROM users WHERE id = %s
-        """, (user_id,))
-        user_data = await cursor.fetchone()
+    cached = _user_cache.get(user_id)
+    if cached:
+        user_data = dict(cached)
+    else:
+        async with get_db_connection() as cursor:
+            await cursor.execute(f"SELECT {USER_COLUMNS} FROM users WHERE id = %s", (user_id,))
+            user_data = await cursor.fetchone()
         
         if user_data is None:
             raise credentials_exception
+        # MySQL returns BOOLEAN columns as 0/1; store real bools in the cache
+        for field in USER_BOOL_FIELDS:
+            user_data[field] = bool(user_data[field])
         
-        # Check if user is suspended
-        if user_data.get('is_suspended') and user_data.get('suspend_until'):
-            suspend_until = user_data['suspend_until']
-            # If suspend_until is still in the future, user is suspended
-            if suspend_until > datetime.now(timezone.utc):
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"Hesabınız askıya alınmış. Askı süresi: {suspend_until.strftime('%d.%m.%Y %H:%M')} - Sebep: {user_data.get('suspend_reason', 'Belirtilmedi')}"
-                )
-            else:
-                # Suspension expired, remove it
-                await cursor.execute("""
-                    UPDATE users 
-                    SET is_suspended = FALSE, suspend_until = NULL, suspend_reason = NULL 
-                    WHERE id = %s
-                """, (user_id,))
-                user_data['is_suspended'] = False
-                user_data['suspend_until'] = None
-                user_data['suspend_reason'] = None
-        
-        # Check if user is muted (for content creation endpoints)
-        if user_data.get('is_muted') and user_data.get('mute_until'):
-            mute_until = user_data['mute_until']
-            if mute_until > datetime.now(timezone.utc):
-                # User is muted, but we only restrict content creation, not general access
-                user_data['is_currently_muted'] = True
-            else:
-                # Mute expired, remove it
-                await cursor.execute("""
-                    UPDATE users 
-                    SET is_muted = FALSE, mute_until = NULL 
-                    WHERE id = %s
-                """, (user_id,))
-                user_data['is_muted'] = False
-                user_data['mute_until'] = None
-                user_data['is_currently_muted'] = False
+        _user_cache.set(user_id, dict(user_data))
+    
+    now = datetime.now(timezone.utc)
+    expired = False
+    
+    # Check if user is suspended
+    if user_data.get('is_suspended') and user_data.get('suspend_until'):
+        suspend_until = user_data['suspend_until']
+        # If suspend_until is still in the future, user is suspended
+        if suspend_until > now:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Hesabınız askıya alınmış. Askı süresi: {suspend_until.strftime('%d.%m.%Y %H:%M')} - Sebep: {user_data.get('suspend_reason', 'Belirtilmedi')}"
+            )
+        else:
+            # Suspension expired, remove it
+            expired = True
+            user_data['is_suspended'] = False
+            user_data['suspend_until'] = None
+            user_data['suspend_reason'] = None
+    
+    # Check if user is muted (for content creation endpoints)
+    if user_data.get('is_muted') and user_data.get('mute_until'):
+        mute_until = user_data['mute_until']
+        if mute_until > now:
+            # User is muted, but we only restrict content creation, not general access
+            user_data['is_currently_muted'] = True
         else:
+            # Mute expired, remove it
+            expired = True
+            user_data['is_muted'] = False
+            user_data['mute_until'] = None
             user_data['is_currently_muted'] = False
-        
-        return User(**user_data)
+    else:
+        user_data['is_currently_muted'] = False
+    
+    if expired:
+        # The request already sees the cleared values; persist them off the hot path
+        invalidate_user_cache(user_id)
+        run_in_background(clear_expired_restrictions(user_id, now))
+    
+    # The row comes from our own database, so skip pydantic validation
+    return User.model_construct(**user_data)
 
-def check_rate_limit(user: User) -> tuple[bool, int]:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await load_current_user(credentials)
+
+# Posting is rate limited to one question/answer/reply per RATE_LIMIT_SECONDS
+RATE_LIMIT_SECONDS = 120
+RATE_LIMIT_CACHE_MAX_SIZE = 50000
+# Users who posted through this worker in the last RATE_LIMIT_SECONDS:
+# user_id -> time.monotonic() of the post
+_recent_posts = TTLCache(RATE_LIMIT_CACHE_MAX_SIZE, RATE_LIMIT_SECONDS)
+
+async def check_rate_limit(cursor, user: User, column: str, now: datetime) -> tuple[bool, int]:
     """
-    Check if user can perform an action based on rate limiting.
+    Check if user can post and, if so, store ``now`` in the user's ``column``
+    (last_question_at or last_answer_at). Call inside get_db_transaction so the
+    claim is undone when the post fails.
     Returns (can_perform_action, seconds_remaining)
     """
     if user.is_admin:
+        await cursor.execute(f"UPDATE users SET {column} = %s WHERE id = %s", (now, user.id))
+        invalidate_user_cache(user.id)
         return True, 0
     
-    now = datetime.now(timezone.utc)
-    rate_limit_minutes = 2
-    
-    # Get the most recent activity time
-    recent_activity = None
-    if user.last_question_at and user.last_answer_at:
-        recent_activity = max(user.last_question_at, user.last_answer_at)
-    elif user.last_question_at:
-        recent_activity = user.last_question_at
-    elif user.last_answer_at:
-        recent_activity = user.last_answer_at
-    
-    if recent_activity is None:
-        return True, 0
+    # Users who just posted through this worker are rejected without a query
+    last = _recent_posts.get(user.id)
+    if last is not None:
+        elapsed = time.monotonic() - last
+        return False, max(int(RATE_LIMIT_SECONDS - elapsed), 1)
     
-    # Ensure recent_activity is timezone-aware
-    if recent_activity.tzinfo is None:
-        recent_activity = recent_activity.replace(tzinfo=timezone.utc)
-    
-    # Calculate time difference
-    time_diff = now - recent_activity
-    required_wait = timedelta(minutes=rate_limit_minutes)
-    
-    if time_diff >= required_wait:
+    # Check and claim in one statement, so concurrent posts through any
+    # worker cannot both get past the check
+    threshold = now - timedelta(seconds=RATE_LIMIT_SECONDS)
+    await cursor.execute(f"""
+        UPDATE users SET {column} = %s 
+        WHERE id = %s 
+          AND (last_question_at IS NULL OR last_question_at <= %s) 
+          AND (last_answer_at IS NULL OR last_answer_at <= %s)
+    """, (now, user.id, threshold, threshold))
+    if cursor.rowcount:
+        invalidate_user_cache(user.id)
         return True, 0
-    else:
-        remaining_seconds = int((required_wait - time_diff).total_seconds())
-        return False, remaining_seconds
+    
+    # Rate limited: read the most recent activity time for the wait message
+    await cursor.execute(
+        "SELECT last_question_at, last_answer_at FROM users WHERE id = %s", (user.id,)
+    )
+    row = await cursor.fetchone() or {}
+    activity = [t for t in (row.get('last_question_at'), row.get('last_answer_at')) if t]
+    if not activity:
+        return False, RATE_LIMIT_SECONDS
+    # Stored times are naive UTC
+    elapsed = (now.replace(tzinfo=None) - max(activity).replace(tzinfo=None)).total_seconds()
+    return False, max(int(RATE_LIMIT_SECONDS - elapsed), 1)
+
+def record_post(user_id: str):
+    """Remember a successful post for the local rate limit check"""
+    _recent_posts.set(user_id, time.monotonic())
 
 def format_time_remaining(seconds: int) -> str:
     """Format remaining time in Turkish"""
@@ -307,39 +479,126 @@ def format_time_remaining(seconds: int) -> str:
     else:
         return f"{remaining_seconds} saniye"
 
-async def create_notification(user_id: str, notification_type: str, title: str, message: str, 
-                            from_user_id: str, from_username: str, 
-                            related_question_id: str = None, related_answer_id: str = None):
-    """Create a new notification"""
-    notification_id = str(uuid.uuid4())
+# Notifications are buffered and inserted in batches by a background task,
+# so posting an answer does not wait for the notification writes
+NOTIFICATION_FLUSH_INTERVAL = 0.05  # seconds
+NOTIFICATION_BATCH_SIZE = 200
+_pending_notifications: List[tuple] = []
+
+def create_notification(user_id: str, notification_type: str, title: str, message: str, 
+                        from_user_id: str, from_username: str, 
+                        related_question_id: str = None, related_answer_id: str = None):
+    """Queue a new notification for the next batch insert"""
+    notification_id = new_id()
+    _pending_notifications.append(
+        (notification_id, user_id, notification_type, title, message, related_question_id, related_answer_id, from_user_id, from_username)
+    )
+
+async def flush_notifications():
+    """Insert the buffered notifications, NOTIFICATION_BATCH_SIZE rows per statement"""
+    global _pending_notifications
+    if not _pending_notifications:
+        return
+    pending, _pending_notifications = _pending_notifications, []
+    written = 0
     
-    async with get_db_connection() as cursor:
-        await cursor.execute("""
-            INSERT INTO notifications 
-            (id, user_id, type, title, message, related_question_id, related_answer_id, from_user_id, from_username)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (notification_id, user_id, notification_type, title, message, related_question_id, related_answer_id, from_user_id, from_username))
+    insert_query = """
+        INSERT INTO notifications 
+        (id, user_id, type, title, message, related_question_id, related_answer_id, from_user_id, from_username)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    
+    try:
+        async with get_db_connection() as cursor:
+            while written < len(pending):
+                batch = pending[written:written + NOTIFICATION_BATCH_SIZE]
+                try:
+                    await cursor.executemany(insert_query, batch)
+                except (IntegrityError, DataError):
+                    # A row the database will never accept (its question/answer
+                    # was deleted before the flush, or a value does not fit)
+                    # would otherwise fail the whole batch on every retry, so
+                    # insert row by row and drop only the failing rows
+                    for row in batch:
+                        try:
+                            await cursor.execute(insert_query, row)
+                        except (IntegrityError, DataError) as e:
+                            print(f"❌ Dropping notification {row[0]}: {e}")
+                written += len(batch)
+    except Exception as e:
+        print(f"❌ Error saving notifications: {e}")
+    finally:
+        # Keep the rows that were not written for the next attempt, also when
+        # the flush is cancelled mid-batch
+        _pending_notifications[:0] = pending[written:]
+
+async def flush_notifications_periodically():
+    """Flush buffered notifications every NOTIFICATION_FLUSH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(NOTIFICATION_FLUSH_INTERVAL)
+        await flush_notifications()
+
+# Question views are counted in memory and written every VIEW_FLUSH_INTERVAL
+# seconds, one UPDATE per question instead of one per view
+VIEW_FLUSH_INTERVAL = 10  # seconds
+_pending_views: Dict[str, int] = {}
+
+def increment_question_views(question_id: str):
+    """Buffer a question view for the next flush"""
+    _pending_views[question_id] = _pending_views.get(question_id, 0) + 1
+
+async def flush_views():
+    """Write the buffered view counts to the database"""
+    global _pending_views
+    if not _pending_views:
+        return
+    pending, _pending_views = _pending_views, {}
+    flushed = False
+    
+    try:
+        async with get_db_connection() as cursor:
+            await cursor.executemany(
+                "UPDATE questions SET view_count = view_count + %s WHERE id = %s",
+                [(count, question_id) for question_id, count in pending.items()]
+            )
+        flushed = True
+    except Exception as e:
+        print(f"❌ Error flushing views: {e}")
+    finally:
+        if not flushed:
+            # Keep the counts for the next attempt, also when the flush is cancelled
+            for question_id, count in pending.items():
+                _pending_views[question_id] = _pending_views.get(question_id, 0) + count
+
+async def flush_views_periodically():
+    """Flush buffered view counts every VIEW_FLUSH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(VIEW_FLUSH_INTERVAL)
+        await flush_views()
+
+_MENTION_RE = re.compile(r'@(\w+)')
 
 def extract_mentions(content: str) -> List[str]:
     """Extract @username mentions from content"""
-    import re
-    mentions = re.findall(r'@(\w+)', content)
-    return list(set(mentions))  # Remove duplicates
+    mentions = _MENTION_RE.findall(content)
+    return list(dict.fromkeys(mentions))  # Remove duplicates, keep order
 
 # Initialize FastAPI
 app = FastAPI(
     title="UniSoruyor.com API",
     description="Türkiye'nin en büyük üniversite öğrenci topluluğu",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=CORS_MAX_AGE,
 )
 
 # Profanity filter for Turkish and English words
@@ -407,256 +666,313 @@ PROFANITY_PATTERNS = [
     (r'(h[\W_]*a[\W_]*y[\W_]*s[\W_]*[ıi][\W_]*y[\W_]*e[\W_]*t)', 'haysıyet'),
 ]
 
+def _trie_regex(words) -> str:
+    """Build a regex matching any of the words, with shared prefixes factored
+    out so the engine follows one branch per character instead of trying
+    every word at every position"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A word may end here; the optional tail is greedy so the longest word wins
+        return f"(?:{body})?" if "" in node else body
+    
+    return build(trie)
+
+def _patterns_regex(patterns) -> str:
+    """Combine (pattern, word) pairs into one regex with a named group each,
+    grouped by first character behind lookaheads so most positions cost one
+    character test"""
+    groups: Dict[str, list] = {}
+    for i, (pattern, _) in enumerate(patterns):
+        body = pattern.removeprefix(r"\b").lstrip("(")
+        first = body[:body.index("]") + 1] if body.startswith("[") else body[0]
+        groups.setdefault(first, []).append(f"(?P<p{i}>{pattern})")
+    
+    first_chars = "".join(first.strip("[]") for first in groups)
+    alternatives = "|".join(f"(?={first})(?:" + "|".join(group) + ")" for first, group in groups.items())
+    return f"(?=[{first_chars}])(?:{alternatives})"
+
+# Compiled once at import so each check is a single scan of the text
+_PROFANITY_WORDS_TRIE = _trie_regex({word.lower() for word in PROFANITY_WORDS})
+_PROFANITY_WORDS_RE = re.compile(_PROFANITY_WORDS_TRIE)
+_PROFANITY_WORDS_IGNORECASE_RE = re.compile(_PROFANITY_WORDS_TRIE, re.IGNORECASE)
+_PROFANITY_PATTERNS_RE = re.compile(_patterns_regex(PROFANITY_PATTERNS), re.IGNORECASE)
+_PROFANITY_PATTERN_WORDS = {f"p{i}": word for i, (_, word) in enumerate(PROFANITY_PATTERNS)}
+
+def _mask(match: re.Match) -> str:
+    """Replace a match with asterisks of the same length"""
+    return '*' * len(match.group())
+
 def contains_profanity(text: str) -> tuple[bool, str]:
     """Check if text contains profanity and return the found word"""
     text_lower = text.lower()
     
     # Check direct word matches
-    for word in PROFANITY_WORDS:
-        if word.lower() in text_lower:
-            return True, word
+    match = _PROFANITY_WORDS_RE.search(text_lower)
+    if match:
+        return True, match.group()
     
     # Check regex patterns for bypassing attempts
-    for pattern, word in PROFANITY_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            return True, word
+    match = _PROFANITY_PATTERNS_RE.search(text_lower)
+    if match:
+        return True, _PROFANITY_PATTERN_WORDS[match.lastgroup]
     
     return False, ""
 
 def filter_profanity(text: str) -> str:
     """Replace profanity with asterisks"""
-    filtered_text = text
+    # Replace direct words, then regex patterns
+    filtered_text = _PROFANITY_WORDS_IGNORECASE_RE.sub(_mask, text)
+    return _PROFANITY_PATTERNS_RE.sub(_mask, filtered_text)
+
+api_router = APIRouter(prefix="/api")
+
+# Static catalog data, serialized once at import and served as raw bytes
+STATIC_CACHE_MAX_AGE = 86400  # seconds
+
+CATEGORIES = {
+    # Fakülteler ve Bölümler
+    "Mühendislik Fakültesi": [
+        "Bilgisayar Mühendisliği", "Makine Mühendisliği", "Elektrik Mühendisliği",
+        "İnşaat Mühendisliği", "Endüstri Mühendisliği", "Harita Mühendisliği",
+        "Jeoloji Mühendisliği", "Maden Mühendisliği", "Metalurji Mühendisliği",
+        "Petrol Mühendisliği", "Tekstil Mühendisliği", "Gıda Mühendisliği",
+        "Çevre Mühendisliği", "Biyomedikal Mühendisliği", "Malzeme Mühendisliği"
+    ],
+    "Tıp Fakültesi": [
+        "Tıp", "Diş Hekimliği", "Eczacılık", "Veteriner Hekim",
+        "Hemşirelik", "Fizyoterapi", "Beslenme ve Diyetetik",
+        "Sağlık Yönetimi", "Tıbbi Sekreterlik"
+    ],
+    "Eğitim Fakültesi": [
+        "Matematik Öğretmenliği", "Fen Bilgisi Öğretmenliği", "Sınıf Öğretmenliği",
+        "İngilizce Öğretmenliği", "Türkçe Öğretmenliği", "Tarih Öğretmenliği",
+        "Coğrafya Öğretmenliği", "Biyoloji Öğretmenliği", "Kimya Öğretmenliği",
+        "Fizik Öğretmenliği", "Okul Öncesi Öğretmenliği", "Özel Eğitim Öğretmenliği"
+    ],
+    "İktisadi ve İdari Bilimler Fakültesi": [
+        "İşletme", "İktisat", "Kamu Yönetimi", "Siyaset Bilimi",
+        "Uluslararası İlişkiler", "Maliye", "Çalışma Ekonomisi",
+        "Econometrics", "İnsan Kaynakları Yönetimi"
+    ],
+    "Hukuk Fakültesi": [
+        "Hukuk"
+    ],
+    "Fen Edebiyat Fakültesi": [
+        "Matematik", "Fizik", "Kimya", "Biyoloji", "Psikoloji",
+        "Sosyoloji", "Türk Dili ve Edebiyatı", "Tarih", "Coğrafya",
+        "Felsefe", "Arkeoloji", "Sanat Tarihi"
+    ],
+    "Mimarlık Fakültesi": [
+        "Mimarlık", "Şehir ve Bölge Planlama", "Peyzaj Mimarlığı",
+        "İç Mimarlık"
+    ],
+    "Güzel Sanatlar Fakültesi": [
+        "Resim", "Heykel", "Grafik", "Müzik", "Sahne Sanatları",
+        "Sinema ve Televizyon", "Fotoğraf"
+    ],
+    "İletişim Fakültesi": [
+        "Gazetecilik", "Halkla İlişkiler", "Reklamcılık",
+        "Radyo Televizyon ve Sinema"
+    ],
+    "Spor Bilimleri Fakültesi": [
+        "Beden Eğitimi ve Spor Öğretmenliği", "Antrenörlük",
+        "Spor Yöneticiliği", "Rekreasyon"
+    ],
+    "Ziraat Fakültesi": [
+        "Ziraat Mühendisliği", "Peyzaj Mimarlığı", "Su Ürünleri Mühendisliği",
+        "Orman Mühendisliği", "Gıda Mühendisliği"
+    ],
+
+    # KYK Yurtları (Büyük Şehirler + Diğer İller)
+    "KYK Yurtları": [
+        "İstanbul", "Ankara", "İzmir", "Bursa", "Eskişehir", "Diğer İller"
+    ],
+
+    # Burslar
+    "Burslar": [
+        "Devlet Bursları", "Özel Burslar", "Başarı Bursları", "İhtiyaç Bursları"
+    ],
+
+    # YKS (Üniversite Sınavı)
+    "YKS": [
+        "TYT (Temel Yeterlilik Testi)", "AYT (Alan Yeterlilik Testi)",
+        "YDT (Yabancı Dil Testi)", "MSÜ (Askeri Öğrenci Seçme)",
+        "DGS (Dikey Geçiş Sınavı)", "ALES (Akademik Personel ve Lisansüstü Eğitimi Giriş Sınavı)",
+        "KPSS (Kamu Personeli Seçme Sınavı)", "YÖKDİL (Yabancı Dil Bilgisi Seviye Tespit Sınavı)",
+        "Sınav Stratejileri", "Kaynak Önerileri", "Deneme Sınavları",
+        "Puan Hesaplamaları", "Tercih Stratejileri", "Üniversite Tanıtımları",
+        "Bölüm Analizleri", "Başarı Hikayeleri"
+    ],
+
+    # Zor Üniversite Dersleri
+    "Dersler": [
+        "Matematik (Kalkülüs)", "Diferansiyel Denklemler", "Lineer Cebir",
+        "Genel Fizik", "Termodinamik", "Elektromanyetik",
+        "Organik Kimya", "Fiziksel Kimya", "Analitik Kimya",
+        "Anatomi", "Fizyoloji", "Biyokimya",
+        "Algoritma ve Programlama", "Veri Yapıları", "Elektronik",
+        "Mekanik", "Malzeme Bilimi", "İstatistik",
+        "Mikroekonomi", "Makroekonomi", "Mali Muhasebe",
+        "Hukuk Dersleri", "Anayasa Hukuku", "Medeni Hukuk"
+    ],
+
+    # Diğer
+    "Diğer": [
+        "Sosyal Aktiviteler", "Barınma", "Beslenme", "Genel Sorular"
+    ]
+}
+
+UNIVERSITIES = [
+    # İstanbul (Devlet)
+    "Boğaziçi Üniversitesi", "Galatasaray Üniversitesi", "İstanbul Medeniyet Üniversitesi",
+    "İstanbul Teknik Üniversitesi", "İstanbul Üniversitesi", "İstanbul Üniversitesi-Cerrahpaşa",
+    "Marmara Üniversitesi", "Milli Savunma Üniversitesi", "Mimar Sinan Güzel Sanatlar Üniversitesi",
+    "Türk-Alman Üniversitesi", "Türk-Japon Bilim ve Teknoloji Üniversitesi", 
+    "Sağlık Bilimleri Üniversitesi", "Yıldız Teknik Üniversitesi",
+    
+    # İstanbul (Vakıf)
+    "Acıbadem Üniversitesi", "Altınbaş Üniversitesi", "Bahçeşehir Üniversitesi", 
+    "Beykoz Üniversitesi", "Bezmialem Vakıf Üniversitesi", "Biruni Üniversitesi",
+    "Demiroğlu Bilim Üniversitesi", "Doğuş Üniversitesi", "Fatih Sultan Mehmet Üniversitesi",
+    "Fenerbahçe Üniversitesi", "Haliç Üniversitesi", "Işık Üniversitesi",
+    "İbn Haldun Üniversitesi", "İstanbul 29 Mayıs Üniversitesi", "İstanbul Arel Üniversitesi",
+    "İstanbul Atlas Üniversitesi", "İstanbul Aydın Üniversitesi", "İstanbul Beykent Üniversitesi",
+    "İstanbul Bilgi Üniversitesi", "İstanbul Esenyurt Üniversitesi", "İstanbul Galata Üniversitesi",
+    "İstanbul Gedik Üniversitesi", "İstanbul Gelişim Üniversitesi", "İstanbul Kent Üniversitesi",
+    "İstanbul Kültür Üniversitesi", "İstanbul Medipol Üniversitesi", "İstanbul Nişantaşı Üniversitesi",
+    "İstanbul Okan Üniversitesi", "İstanbul Rumeli Üniversitesi", "İstanbul Sabahattin Zaim Üniversitesi",
+    "İstanbul Sağlık ve Teknoloji Üniversitesi", "İstanbul Ticaret Üniversitesi", 
+    "İstanbul Topkapı Üniversitesi", "İstanbul Yeni Yüzyıl Üniversitesi", "İstinye Üniversitesi",
+    "Kadir Has Üniversitesi", "Koç Üniversitesi", "Maltepe Üniversitesi", "MEF Üniversitesi",
+    "Özyeğin Üniversitesi", "Piri Reis Üniversitesi", "Sabancı Üniversitesi", 
+    "Üsküdar Üniversitesi", "Yeditepe Üniversitesi",
+    
+    # Ankara (Devlet)
+    "Jandarma ve Sahil Güvenlik Akademisi", "Ankara Üniversitesi", 
+    "Ankara Müzik ve Güzel Sanatlar Üniversitesi", "Ankara Hacı Bayram Veli Üniversitesi",
+    "Ankara Sosyal Bilimler Üniversitesi", "Gazi Üniversitesi", "Hacettepe Üniversitesi",
+    "Orta Doğu Teknik Üniversitesi", "Ankara Yıldırım Beyazıt Üniversitesi", "Polis Akademisi",
+    
+    # Ankara (Vakıf)
+    "Ankara Bilim Üniversitesi", "Ankara Medipol Üniversitesi", "Atılım Üniversitesi",
+    "Başkent Üniversitesi", "Çankaya Üniversitesi", "İhsan Doğramacı Bilkent Üniversitesi",
+    "Lokman Hekim Üniversitesi", "Ostim Teknik Üniversitesi", "TED Üniversitesi",
+    "TOBB Ekonomi ve Teknoloji Üniversitesi", "Ufuk Üniversitesi", 
+    "Türk Hava Kurumu Üniversitesi", "Yüksek İhtisas Üniversitesi",
     
-    # Replace direct words
-    for word in PROFANITY_WORDS:
-        pattern = re.compile(re.escape(word), re.IGNORECASE)
-        filtered_text = pattern.sub('*' * len(word), filtered_text)
+    # İzmir (Devlet)
+    "Dokuz Eylül Üniversitesi", "Ege Üniversitesi", "İzmir Yüksek Teknoloji Enstitüsü",
+    "İzmir Kâtip Çelebi Üniversitesi", "İzmir Bakırçay Üniversitesi", "İzmir Demokrasi Üniversitesi",
     
-    # Replace regex patterns
-    for pattern, _ in PROFANITY_PATTERNS:
-        filtered_text = re.sub(pattern, lambda m: '*' * len(m.group()), filtered_text, flags=re.IGNORECASE)
+    # İzmir (Vakıf)
+    "İzmir Ekonomi Üniversitesi", "İzmir Tınaztepe Üniversitesi", "Yaşar Üniversitesi",
     
-    return filtered_text
+    # Diğer Şehirler (Devlet)
+    "Adana Alparslan Türkeş Bilim ve Teknoloji Üniversitesi", "Çukurova Üniversitesi",
+    "Adıyaman Üniversitesi", "Afyon Kocatepe Üniversitesi", "Afyonkarahisar Sağlık Bilimleri Üniversitesi",
+    "Ağrı İbrahim Çeçen Üniversitesi", "Aksaray Üniversitesi", "Amasya Üniversitesi",
+    "Akdeniz Üniversitesi", "Alanya Alaaddin Keykubat Üniversitesi", "Ardahan Üniversitesi",
+    "Artvin Çoruh Üniversitesi", "Aydın Adnan Menderes Üniversitesi", "Balıkesir Üniversitesi",
+    "Bandırma Onyedi Eylül Üniversitesi", "Bartın Üniversitesi", "Batman Üniversitesi",
+    "Bayburt Üniversitesi", "Bilecik Şeyh Edebali Üniversitesi", "Bingöl Üniversitesi",
+    "Bitlis Eren Üniversitesi", "Bolu Abant İzzet Baysal Üniversitesi", "Burdur Mehmet Akif Ersoy Üniversitesi",
+    "Bursa Teknik Üniversitesi", "Bursa Uludağ Üniversitesi", "Çanakkale Onsekiz Mart Üniversitesi",
+    "Çankırı Karatekin Üniversitesi", "Hitit Üniversitesi", "Pamukkale Üniversitesi",
+    "Dicle Üniversitesi", "Düzce Üniversitesi", "Trakya Üniversitesi", "Fırat Üniversitesi",
+    "Erzincan Binali Yıldırım Üniversitesi", "Atatürk Üniversitesi", "Erzurum Teknik Üniversitesi",
+    "Anadolu Üniversitesi", "Eskişehir Osmangazi Üniversitesi", "Eskişehir Teknik Üniversitesi",
+    "Gaziantep Üniversitesi", "Gaziantep İslam Bilim ve Teknoloji Üniversitesi", "Giresun Üniversitesi",
+    "Gümüşhane Üniversitesi", "Hakkari Üniversitesi", "İskenderun Teknik Üniversitesi",
+    "Hatay Mustafa Kemal Üniversitesi", "Iğdır Üniversitesi", "Süleyman Demirel Üniversitesi",
+    "Isparta Uygulamalı Bilimler Üniversitesi", "Kahramanmaraş Sütçü İmam Üniversitesi",
+    "Kahramanmaraş İstiklal Üniversitesi", "Karabük Üniversitesi", "Karamanoğlu Mehmetbey Üniversitesi",
+    "Kafkas Üniversitesi", "Kastamonu Üniversitesi", "Abdullah Gül Üniversitesi",
+    "Erciyes Üniversitesi", "Kayseri Üniversitesi", "Kırıkkale Üniversitesi", "Kırklareli Üniversitesi",
+    "Kırşehir Ahi Evran Üniversitesi", "Kilis 7 Aralık Üniversitesi", "Gebze Teknik Üniversitesi",
+    "Kocaeli Üniversitesi", "Konya Teknik Üniversitesi", "Necmettin Erbakan Üniversitesi",
+    "Selçuk Üniversitesi", "Kütahya Dumlupınar Üniversitesi", "Kütahya Sağlık Bilimleri Üniversitesi",
+    "İnönü Üniversitesi", "Malatya Turgut Özal Üniversitesi", "Manisa Celal Bayar Üniversitesi",
+    "Mardin Artuklu Üniversitesi", "Mersin Üniversitesi", "Tarsus Üniversitesi",
+    "Muğla Sıtkı Koçman Üniversitesi", "Muş Alparslan Üniversitesi", "Nevşehir Hacı Bektaş Veli Üniversitesi",
+    "Niğde Ömer Halisdemir Üniversitesi", "Ordu Üniversitesi", "Osmaniye Korkut Ata Üniversitesi",
+    "Recep Tayyip Erdoğan Üniversitesi", "Sakarya Üniversitesi", "Sakarya Uygulamalı Bilimler Üniversitesi",
+    "Ondokuz Mayıs Üniversitesi", "Samsun Üniversitesi", "Siirt Üniversitesi", "Sinop Üniversitesi",
+    "Sivas Cumhuriyet Üniversitesi", "Sivas Bilim ve Teknoloji Üniversitesi", "Şırnak Üniversitesi",
+    "Tekirdağ Namık Kemal Üniversitesi", "Tokat Gaziosmanpaşa Üniversitesi", "Trabzon Üniversitesi",
+    "Karadeniz Teknik Üniversitesi", "Uşak Üniversitesi", "Van Yüzüncü Yıl Üniversitesi",
+    "Yalova Üniversitesi", "Yozgat Bozok Üniversitesi", "Zonguldak Bülent Ecevit Üniversitesi",
+    
+    # Vakıf Üniversiteleri (Diğer Şehirler)
+    "Alanya Üniversitesi", "Antalya Belek Üniversitesi", "Antalya Bilim Üniversitesi",
+    "Hasan Kalyoncu Üniversitesi", "Sanko Üniversitesi", "Mudanya Üniversitesi",
+    "Çağ Üniversitesi", "Toros Üniversitesi", "Kapadokya Üniversitesi", "Nuh Naci Yazgan Üniversitesi",
+    "Kocaeli Sağlık ve Teknoloji Üniversitesi", "Konya Gıda ve Tarım Üniversitesi", 
+    "KTO Karatay Üniversitesi"
+]
 
-api_router = APIRouter(prefix="/api")
+FACULTIES = [
+    "Mühendislik Fakültesi",
+    "Tıp Fakültesi", 
+    "Eğitim Fakültesi",
+    "İktisadi ve İdari Bilimler Fakültesi",
+    "Hukuk Fakültesi",
+    "Fen Edebiyat Fakültesi",
+    "Mimarlık Fakültesi",
+    "Güzel Sanatlar Fakültesi",
+    "İletişim Fakültesi",
+    "Spor Bilimleri Fakültesi",
+    "Ziraat Fakültesi",
+    "Veteriner Fakültesi",
+    "Diş Hekimliği Fakültesi",
+    "Eczacılık Fakültesi",
+    "Sağlık Bilimleri Fakültesi",
+    "Teknoloji Fakültesi",
+    "Meslek Yüksekokulu",
+    "İlahiyat Fakültesi",
+    "Turizm Fakültesi"
+]
+
+def _static_payload(data) -> tuple:
+    """Serialize static data once and derive its ETag"""
+    body = orjson.dumps(data)
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+_CATEGORIES_PAYLOAD = _static_payload({"categories": CATEGORIES})
+_UNIVERSITIES_PAYLOAD = _static_payload({"universities": sorted(set(UNIVERSITIES))})
+_FACULTIES_PAYLOAD = _static_payload({"faculties": sorted(FACULTIES)})
+
+def static_json_response(request: Request, payload: tuple) -> Response:
+    """Return a pre-serialized payload, or 304 if the client already has it"""
+    body, etag = payload
+    headers = {"Cache-Control": f"public, max-age={STATIC_CACHE_MAX_AGE}", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Categories data
 @api_router.get("/categories")
-async def get_categories():
-    categories = {
-        # Fakülteler ve Bölümler
-        "Mühendislik Fakültesi": [
-            "Bilgisayar Mühendisliği", "Makine Mühendisliği", "Elektrik Mühendisliği",
-            "İnşaat Mühendisliği", "Endüstri Mühendisliği", "Harita Mühendisliği",
-            "Jeoloji Mühendisliği", "Maden Mühendisliği", "Metalurji Mühendisliği",
-            "Petrol Mühendisliği", "Tekstil Mühendisliği", "Gıda Mühendisliği",
-            "Çevre Mühendisliği", "Biyomedikal Mühendisliği", "Malzeme Mühendisliği"
-        ],
-        "Tıp Fakültesi": [
-            "Tıp", "Diş Hekimliği", "Eczacılık", "Veteriner Hekim",
-            "Hemşirelik", "Fizyoterapi", "Beslenme ve Diyetetik",
-            "Sağlık Yönetimi", "Tıbbi Sekreterlik"
-        ],
-        "Eğitim Fakültesi": [
-            "Matematik Öğretmenliği", "Fen Bilgisi Öğretmenliği", "Sınıf Öğretmenliği",
-            "İngilizce Öğretmenliği", "Türkçe Öğretmenliği", "Tarih Öğretmenliği",
-            "Coğrafya Öğretmenliği", "Biyoloji Öğretmenliği", "Kimya Öğretmenliği",
-            "Fizik Öğretmenliği", "Okul Öncesi Öğretmenliği", "Özel Eğitim Öğretmenliği"
-        ],
-        "İktisadi ve İdari Bilimler Fakültesi": [
-            "İşletme", "İktisat", "Kamu Yönetimi", "Siyaset Bilimi",
-            "Uluslararası İlişkiler", "Maliye", "Çalışma Ekonomisi",
-            "Econometrics", "İnsan Kaynakları Yönetimi"
-        ],
-        "Hukuk Fakültesi": [
-            "Hukuk"
-        ],
-        "Fen Edebiyat Fakültesi": [
-            "Matematik", "Fizik", "Kimya", "Biyoloji", "Psikoloji",
-            "Sosyoloji", "Türk Dili ve Edebiyatı", "Tarih", "Coğrafya",
-            "Felsefe", "Arkeoloji", "Sanat Tarihi"
-        ],
-        "Mimarlık Fakültesi": [
-            "Mimarlık", "Şehir ve Bölge Planlama", "Peyzaj Mimarlığı",
-            "İç Mimarlık"
-        ],
-        "Güzel Sanatlar Fakültesi": [
-            "Resim", "Heykel", "Grafik", "Müzik", "Sahne Sanatları",
-            "Sinema ve Televizyon", "Fotoğraf"
-        ],
-        "İletişim Fakültesi": [
-            "Gazetecilik", "Halkla İlişkiler", "Reklamcılık",
-            "Radyo Televizyon ve Sinema"
-        ],
-        "Spor Bilimleri Fakültesi": [
-            "Beden Eğitimi ve Spor Öğretmenliği", "Antrenörlük",
-            "Spor Yöneticiliği", "Rekreasyon"
-        ],
-        "Ziraat Fakültesi": [
-            "Ziraat Mühendisliği", "Peyzaj Mimarlığı", "Su Ürünleri Mühendisliği",
-            "Orman Mühendisliği", "Gıda Mühendisliği"
-        ],
-
-        # KYK Yurtları (Büyük Şehirler + Diğer İller)
-        "KYK Yurtları": [
-            "İstanbul", "Ankara", "İzmir", "Bursa", "Eskişehir", "Diğer İller"
-        ],
-
-        # Burslar
-        "Burslar": [
-            "Devlet Bursları", "Özel Burslar", "Başarı Bursları", "İhtiyaç Bursları"
-        ],
-
-        # YKS (Üniversite Sınavı)
-        "YKS": [
-            "TYT (Temel Yeterlilik Testi)", "AYT (Alan Yeterlilik Testi)",
-            "YDT (Yabancı Dil Testi)", "MSÜ (Askeri Öğrenci Seçme)",
-            "DGS (Dikey Geçiş Sınavı)", "ALES (Akademik Personel ve Lisansüstü Eğitimi Giriş Sınavı)",
-            "KPSS (Kamu Personeli Seçme Sınavı)", "YÖKDİL (Yabancı Dil Bilgisi Seviye Tespit Sınavı)",
-            "Sınav Stratejileri", "Kaynak Önerileri", "Deneme Sınavları",
-            "Puan Hesaplamaları", "Tercih Stratejileri", "Üniversite Tanıtımları",
-            "Bölüm Analizleri", "Başarı Hikayeleri"
-        ],
-
-        # Zor Üniversite Dersleri
-        "Dersler": [
-            "Matematik (Kalkülüs)", "Diferansiyel Denklemler", "Lineer Cebir",
-            "Genel Fizik", "Termodinamik", "Elektromanyetik",
-            "Organik Kimya", "Fiziksel Kimya", "Analitik Kimya",
-            "Anatomi", "Fizyoloji", "Biyokimya",
-            "Algoritma ve Programlama", "Veri Yapıları", "Elektronik",
-            "Mekanik", "Malzeme Bilimi", "İstatistik",
-            "Mikroekonomi", "Makroekonomi", "Mali Muhasebe",
-            "Hukuk Dersleri", "Anayasa Hukuku", "Medeni Hukuk"
-        ],
-
-        # Diğer
-        "Diğer": [
-            "Sosyal Aktiviteler", "Barınma", "Beslenme", "Genel Sorular"
-        ]
-    }
-    return {"categories": categories}
+async def get_categories(request: Request):
+    return static_json_response(request, _CATEGORIES_PAYLOAD)
 
 # Universities endpoint
 @api_router.get("/universities")
-async def get_universities():
-    universities = [
-        # İstanbul (Devlet)
-        "Boğaziçi Üniversitesi", "Galatasaray Üniversitesi", "İstanbul Medeniyet Üniversitesi",
-        "İstanbul Teknik Üniversitesi", "İstanbul Üniversitesi", "İstanbul Üniversitesi-Cerrahpaşa",
-        "Marmara Üniversitesi", "Milli Savunma Üniversitesi", "Mimar Sinan Güzel Sanatlar Üniversitesi",
-        "Türk-Alman Üniversitesi", "Türk-Japon Bilim ve Teknoloji Üniversitesi", 
-        "Sağlık Bilimleri Üniversitesi", "Yıldız Teknik Üniversitesi",
-        
-        # İstanbul (Vakıf)
-        "Acıbadem Üniversitesi", "Altınbaş Üniversitesi", "Bahçeşehir Üniversitesi", 
-        "Beykoz Üniversitesi", "Bezmialem Vakıf Üniversitesi", "Biruni Üniversitesi",
-        "Demiroğlu Bilim Üniversitesi", "Doğuş Üniversitesi", "Fatih Sultan Mehmet Üniversitesi",
-        "Fenerbahçe Üniversitesi", "Haliç Üniversitesi", "Işık Üniversitesi",
-        "İbn Haldun Üniversitesi", "İstanbul 29 Mayıs Üniversitesi", "İstanbul Arel Üniversitesi",
-        "İstanbul Atlas Üniversitesi", "İstanbul Aydın Üniversitesi", "İstanbul Beykent Üniversitesi",
-        "İstanbul Bilgi Üniversitesi", "İstanbul Esenyurt Üniversitesi", "İstanbul Galata Üniversitesi",
-        "İstanbul Gedik Üniversitesi", "İstanbul Gelişim Üniversitesi", "İstanbul Kent Üniversitesi",
-        "İstanbul Kültür Üniversitesi", "İstanbul Medipol Üniversitesi", "İstanbul Nişantaşı Üniversitesi",
-        "İstanbul Okan Üniversitesi", "İstanbul Rumeli Üniversitesi", "İstanbul Sabahattin Zaim Üniversitesi",
-        "İstanbul Sağlık ve Teknoloji Üniversitesi", "İstanbul Ticaret Üniversitesi", 
-        "İstanbul Topkapı Üniversitesi", "İstanbul Yeni Yüzyıl Üniversitesi", "İstinye Üniversitesi",
-        "Kadir Has Üniversitesi", "Koç Üniversitesi", "Maltepe Üniversitesi", "MEF Üniversitesi",
-        "Özyeğin Üniversitesi", "Piri Reis Üniversitesi", "Sabancı Üniversitesi", 
-        "Üsküdar Üniversitesi", "Yeditepe Üniversitesi",
-        
-        # Ankara (Devlet)
-        "Jandarma ve Sahil Güvenlik Akademisi", "Ankara Üniversitesi", 
-        "Ankara Müzik ve Güzel Sanatlar Üniversitesi", "Ankara Hacı Bayram Veli Üniversitesi",
-        "Ankara Sosyal Bilimler Üniversitesi", "Gazi Üniversitesi", "Hacettepe Üniversitesi",
-        "Orta Doğu Teknik Üniversitesi", "Ankara Yıldırım Beyazıt Üniversitesi", "Polis Akademisi",
-        
-        # Ankara (Vakıf)
-        "Ankara Bilim Üniversitesi", "Ankara Medipol Üniversitesi", "Atılım Üniversitesi",
-        "Başkent Üniversitesi", "Çankaya Üniversitesi", "İhsan Doğramacı Bilkent Üniversitesi",
-        "Lokman Hekim Üniversitesi", "Ostim Teknik Üniversitesi", "TED Üniversitesi",
-        "TOBB Ekonomi ve Teknoloji Üniversitesi", "Ufuk Üniversitesi", 
-        "Türk Hava Kurumu Üniversitesi", "Yüksek İhtisas Üniversitesi",
-        
-        # İzmir (Devlet)
-        "Dokuz Eylül Üniversitesi", "Ege Üniversitesi", "İzmir Yüksek Teknoloji Enstitüsü",
-        "İzmir Kâtip Çelebi Üniversitesi", "İzmir Bakırçay Üniversitesi", "İzmir Demokrasi Üniversitesi",
-        
-        # İzmir (Vakıf)
-        "İzmir Ekonomi Üniversitesi", "İzmir Tınaztepe Üniversitesi", "Yaşar Üniversitesi",
-        
-        # Diğer Şehirler (Devlet)
-        "Adana Alparslan Türkeş Bilim ve Teknoloji Üniversitesi", "Çukurova Üniversitesi",
-        "Adıyaman Üniversitesi", "Afyon Kocatepe Üniversitesi", "Afyonkarahisar Sağlık Bilimleri Üniversitesi",
-        "Ağrı İbrahim Çeçen Üniversitesi", "Aksaray Üniversitesi", "Amasya Üniversitesi",
-        "Akdeniz Üniversitesi", "Alanya Alaaddin Keykubat Üniversitesi", "Ardahan Üniversitesi",
-        "Artvin Çoruh Üniversitesi", "Aydın Adnan Menderes Üniversitesi", "Balıkesir Üniversitesi",
-        "Bandırma Onyedi Eylül Üniversitesi", "Bartın Üniversitesi", "Batman Üniversitesi",
-        "Bayburt Üniversitesi", "Bilecik Şeyh Edebali Üniversitesi", "Bingöl Üniversitesi",
-        "Bitlis Eren Üniversitesi", "Bolu Abant İzzet Baysal Üniversitesi", "Burdur Mehmet Akif Ersoy Üniversitesi",
-        "Bursa Teknik Üniversitesi", "Bursa Uludağ Üniversitesi", "Çanakkale Onsekiz Mart Üniversitesi",
-        "Çankırı Karatekin Üniversitesi", "Hitit Üniversitesi", "Pamukkale Üniversitesi",
-        "Dicle Üniversitesi", "Düzce Üniversitesi", "Trakya Üniversitesi", "Fırat Üniversitesi",
-        "Erzincan Binali Yıldırım Üniversitesi", "Atatürk Üniversitesi", "Erzurum Teknik Üniversitesi",
-        "Anadolu Üniversitesi", "Eskişehir Osmangazi Üniversitesi", "Eskişehir Teknik Üniversitesi",
-        "Gaziantep Üniversitesi", "Gaziantep İslam Bilim ve Teknoloji Üniversitesi", "Giresun Üniversitesi",
-        "Gümüşhane Üniversitesi", "Hakkari Üniversitesi", "İskenderun Teknik Üniversitesi",
-        "Hatay Mustafa Kemal Üniversitesi", "Iğdır Üniversitesi", "Süleyman Demirel Üniversitesi",
-        "Isparta Uygulamalı Bilimler Üniversitesi", "Kahramanmaraş Sütçü İmam Üniversitesi",
-        "Kahramanmaraş İstiklal Üniversitesi", "Karabük Üniversitesi", "Karamanoğlu Mehmetbey Üniversitesi",
-        "Kafkas Üniversitesi", "Kastamonu Üniversitesi", "Abdullah Gül Üniversitesi",
-        "Erciyes Üniversitesi", "Kayseri Üniversitesi", "Kırıkkale Üniversitesi", "Kırklareli Üniversitesi",
-        "Kırşehir Ahi Evran Üniversitesi", "Kilis 7 Aralık Üniversitesi", "Gebze Teknik Üniversitesi",
-        "Kocaeli Üniversitesi", "Konya Teknik Üniversitesi", "Necmettin Erbakan Üniversitesi",
-        "Selçuk Üniversitesi", "Kütahya Dumlupınar Üniversitesi", "Kütahya Sağlık Bilimleri Üniversitesi",
-        "İnönü Üniversitesi", "Malatya Turgut Özal Üniversitesi", "Manisa Celal Bayar Üniversitesi",
-        "Mardin Artuklu Üniversitesi", "Mersin Üniversitesi", "Tarsus Üniversitesi",
-        "Muğla Sıtkı Koçman Üniversitesi", "Muş Alparslan Üniversitesi", "Nevşehir Hacı Bektaş Veli Üniversitesi",
-        "Niğde Ömer Halisdemir Üniversitesi", "Ordu Üniversitesi", "Osmaniye Korkut Ata Üniversitesi",
-        "Recep Tayyip Erdoğan Üniversitesi", "Sakarya Üniversitesi", "Sakarya Uygulamalı Bilimler Üniversitesi",
-        "Ondokuz Mayıs Üniversitesi", "Samsun Üniversitesi", "Siirt Üniversitesi", "Sinop Üniversitesi",
-        "Sivas Cumhuriyet Üniversitesi", "Sivas Bilim ve Teknoloji Üniversitesi", "Şırnak Üniversitesi",
-        "Tekirdağ Namık Kemal Üniversitesi", "Tokat Gaziosmanpaşa Üniversitesi", "Trabzon Üniversitesi",
-        "Karadeniz Teknik Üniversitesi", "Uşak Üniversitesi", "Van Yüzüncü Yıl Üniversitesi",
-        "Yalova Üniversitesi", "Yozgat Bozok Üniversitesi", "Zonguldak Bülent Ecevit Üniversitesi",
-        
-        # Vakıf Üniversiteleri (Diğer Şehirler)
-        "Alanya Üniversitesi", "Antalya Belek Üniversitesi", "Antalya Bilim Üniversitesi",
-        "Hasan Kalyoncu Üniversitesi", "Sanko Üniversitesi", "Mudanya Üniversitesi",
-        "Çağ Üniversitesi", "Toros Üniversitesi", "Kapadokya Üniversitesi", "Nuh Naci Yazgan Üniversitesi",
-        "Kocaeli Sağlık ve Teknoloji Üniversitesi", "Konya Gıda ve Tarım Üniversitesi", 
-        "KTO Karatay Üniversitesi"
-    ]
-    
-    # Remove duplicates and sort
-    universities = sorted(list(set(universities)))
-    return {"universities": universities}
+async def get_universities(request: Request):
+    return static_json_response(request, _UNIVERSITIES_PAYLOAD)
 
 # Faculties endpoint
 @api_router.get("/faculties")
-async def get_faculties():
-    faculties = [
-        "Mühendislik Fakültesi",
-        "Tıp Fakültesi", 
-        "Eğitim Fakültesi",
-        "İktisadi ve İdari Bilimler Fakültesi",
-        "Hukuk Fakültesi",
-        "Fen Edebiyat Fakültesi",
-        "Mimarlık Fakültesi",
-        "Güzel Sanatlar Fakültesi",
-        "İletişim Fakültesi",
-        "Spor Bilimleri Fakültesi",
-        "Ziraat Fakültesi",
-        "Veteriner Fakültesi",
-        "Diş Hekimliği Fakültesi",
-        "Eczacılık Fakültesi",
-        "Sağlık Bilimleri Fakültesi",
-        "Teknoloji Fakültesi",
-        "Meslek Yüksekokulu",
-        "İlahiyat Fakültesi",
-        "Turizm Fakültesi"
-    ]
-    return {"faculties": sorted(faculties)}
+async def get_faculties(request: Request):
+    return static_json_response(request, _FACULTIES_PAYLOAD)
 
 # Authentication endpoints
 @api_router.post("/auth/register", response_model=Token)
@@ -678,8 +994,8 @@ async def register(user_data: UserCreate):
             raise HTTPException(status_code=400, detail="Mail adresi veya kullanıcı adı zaten kullanılıyor")
         
         # Hash password and create user
-        password_hash = pwd_context.hash(user_data.password)
-        user_id = str(uuid.uuid4())
+        password_hash = await asyncio.to_thread(get_password_hash, user_data.password)
+        user_id = new_id()
         
         # Set university info based on YKS student status
         if user_data.isYKSStudent:
@@ -719,14 +1035,16 @@ async def register(user_data: UserCreate):
 async def login(user_credentials: UserLogin):
     async with get_db_connection() as cursor:
         # Check by email or username
-        await cursor.execute("""
-            SELECT * FROM users 
+        await cursor.execute(f"""
+            SELECT {USER_COLUMNS} FROM users 
             WHERE email = %s OR username = %s
         """, (user_credentials.email_or_username, user_credentials.email_or_username))
         
         user = await cursor.fetchone()
         
-        if not user or not pwd_context.verify(user_credentials.password, user['password_hash']):
+        if not user or not await asyncio.to_thread(
+            verify_password, user_credentials.password, user['password_hash']
+        ):
             raise HTTPException(status_code=400, detail="Mail adresi/kullanıcı adı veya şifre hatalı")
         
         # Create access token
@@ -760,15 +1078,6 @@ async def create_question(
     question_data: QuestionCreate,
     current_user: User = Depends(get_current_user)
 ):
-    # Check rate limit
-    can_post, seconds_remaining = check_rate_limit(current_user)
-    if not can_post:
-        time_remaining = format_time_remaining(seconds_remaining)
-        raise HTTPException(
-            status_code=429, 
-            detail=f"Çok sık soru soruyorsunuz. {time_remaining} sonra tekrar deneyebilirsiniz."
-        )
-    
     # Check if user is muted
     if hasattr(current_user, 'is_currently_muted') and current_user.is_currently_muted:
         mute_until = current_user.mute_until.strftime('%d.%m.%Y %H:%M') if current_user.mute_until else 'bilinmiyor'
@@ -788,7 +1097,7 @@ async def create_question(
             detail=f"İçeriğinizde uygunsuz kelime tespit edildi: '{profane_word}'. Lütfen saygılı bir dil kullanın."
         )
     
-    question_id = str(uuid.uuid4())
+    question_id = new_id()
     now = datetime.now(timezone.utc)
     
     question = Question(
@@ -805,7 +1114,16 @@ async def create_question(
         updated_at=now
     )
     
-    async with get_db_connection() as cursor:
+    async with get_db_transaction() as cursor:
+        # Check rate limit (and record this post's time)
+        can_post, seconds_remaining = await check_rate_limit(cursor, current_user, "last_question_at", now)
+        if not can_post:
+            time_remaining = format_time_remaining(seconds_remaining)
+            raise HTTPException(
+                status_code=429, 
+                detail=f"Çok sık soru soruyorsunuz. {time_remaining} sonra tekrar deneyebilirsiniz."
+            )
+        
         await cursor.execute("""
             INSERT INTO questions 
             (id, title, content, author_id, author_username, author_university, author_faculty, author_department, category)
@@ -813,74 +1131,92 @@ async def create_question(
         """, (question_id, question_data.title, question_data.content, current_user.id,
               current_user.username, current_user.university, current_user.faculty,
               current_user.department, question_data.category))
-        
-        # Update user's last question timestamp
-        await cursor.execute(
-            "UPDATE users SET last_question_at = %s WHERE id = %s",
-            (now, current_user.id)
-        )
+        _question_count_cache.clear()
+    record_post(current_user.id)
     
     return question
 
+# Question totals for the numbered pager, reused briefly across requests
+# (category -> (expires_at, total))
+QUESTION_COUNT_CACHE_TTL = 60  # seconds
+QUESTION_COUNT_CACHE_MAX_SIZE = 256
+_question_count_cache = TTLCache(QUESTION_COUNT_CACHE_MAX_SIZE, QUESTION_COUNT_CACHE_TTL)
+
+def question_cursor(question: dict) -> str:
+    """Keyset cursor pointing just past a question: created_at and id"""
+    return f"{question['created_at'].isoformat()}_{question['id']}"
+
 @api_router.get("/questions")
-async def get_questions(page: int = 1, limit: int = 15, category: str = None):
-    offset = (page - 1) * limit
+async def get_questions(page: int = 1, limit: int = 15, category: str = None, cursor: str = None):
+    """List questions newest first
     
-    async with get_db_connection() as cursor:
-        # Build query with optional category filter
-        if category:
-            count_query = "SELECT COUNT(*) as total FROM questions WHERE category LIKE %s"
-            questions_query = """
-                SELECT q.*, 
-                       (SELECT COUNT(*) FROM question_likes ql WHERE ql.question_id = q.id) as like_count
-                FROM questions q 
-                WHERE category LIKE %s 
-                ORDER BY created_at DESC 
-                LIMIT %s OFFSET %s
-            """
-            await cursor.execute(count_query, (f"%{category}%",))
-            total_result = await cursor.fetchone()
-            total_count = total_result['total']
-            
-            await cursor.execute(questions_query, (f"%{category}%", limit, offset))
-        else:
-            count_query = "SELECT COUNT(*) as total FROM questions"
-            questions_query = """
-                SELECT q.*,
-                       (SELECT COUNT(*) FROM question_likes ql WHERE ql.question_id = q.id) as like_count
-                FROM questions q 
-                ORDER BY created_at DESC 
-                LIMIT %s OFFSET %s
-            """
-            await cursor.execute(count_query)
-            total_result = await cursor.fetchone()
-            total_count = total_result['total']
+    Pass the ``next_cursor`` of the previous response as ``cursor`` to fetch
+    the next page without OFFSET scanning or counting all questions.
+    """
+    conditions = []
+    params = []
+    if category:
+        # Exact match, so idx_category_created serves the filter and the order
+        conditions.append("category = %s")
+        params.append(category)
+    if cursor:
+        try:
+            created_at, _, last_id = cursor.partition("_")
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci")
+        conditions.append("(created_at < %s OR (created_at = %s AND id < %s))")
+        params += [created_at, created_at, last_id]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    async with get_db_connection() as db_cursor:
+        # One extra row tells whether there is a next page
+        await db_cursor.execute(f"""
+            SELECT q.*
+            FROM questions q 
+            {where} 
+            ORDER BY created_at DESC, id DESC 
+            LIMIT %s OFFSET %s
+        """, (*params, limit + 1, 0 if cursor else (page - 1) * limit))
+        questions_data = await db_cursor.fetchall()
+        
+        has_next = len(questions_data) > limit
+        questions_data = questions_data[:limit]
+        
+        pagination = None
+        if not cursor:
+            # The numbered pager needs the total; keyset pages skip counting
+            total_count = _question_count_cache.get(category)
+            if total_count is None:
+                await db_cursor.execute(
+                    f"SELECT COUNT(*) as total FROM questions {where}", params
+                )
+                total_count = (await db_cursor.fetchone())['total']
+                _question_count_cache.set(category, total_count)
             
-            await cursor.execute(questions_query, (limit, offset))
-        
-        questions_data = await cursor.fetchall()
-        
-        # Calculate pagination info
-        total_pages = (total_count + limit - 1) // limit
-        has_prev = page > 1
-        has_next = page < total_pages
-        
-        pagination = PaginationInfo(
-            current_page=page,
-            total_pages=total_pages,
-            total_count=total_count,
-            has_prev=has_prev,
-            has_next=has_next
-        )
+            # Calculate pagination info
+            total_pages = (total_count + limit - 1) // limit
+            if has_next:
+                # The cached total may lag behind newly posted questions
+                total_pages = max(total_pages, page + 1)
+            pagination = PaginationInfo(
+                current_page=page,
+                total_pages=total_pages,
+                total_count=total_count,
+                has_prev=page > 1,
+                has_next=has_next
+            )
         
+        # Rows come from our own database, so skip pydantic validation
         questions = []
         for q_data in questions_data:
-            question = Question(**q_data)
+            question = Question.model_construct(**q_data)
             questions.append(question)
         
         return {
             "questions": questions,
-            "pagination": pagination
+            "pagination": pagination,
+            "next_cursor": question_cursor(questions_data[-1]) if has_next else None
         }
 
 # Get single question by ID
@@ -894,8 +1230,8 @@ async def get_question(question_id: str):
                    u.university as author_university,
                    u.faculty as author_faculty,
                    u.department as author_department,
-                   (SELECT COUNT(*) FROM question_likes ql WHERE ql.question_id = q.id) as like_count,
-                   (SELECT COUNT(*) FROM answers a WHERE a.question_id = q.id) as answer_count
+                   (SELECT COUNT(*) FROM answers a WHERE a.question_id = q.id) as answer_count,
+                   (SELECT JSON_ARRAYAGG(ql.user_id) FROM question_likes ql WHERE ql.question_id = q.id) as liked_by
             FROM questions q
             JOIN users u ON q.author_id = u.id
             WHERE q.id = %s
@@ -905,20 +1241,14 @@ async def get_question(question_id: str):
         if not question:
             raise HTTPException(status_code=404, detail="Soru bulunamadı")
         
-        # Get question likes
-        await cursor.execute("""
-            SELECT user_id FROM question_likes WHERE question_id = %s
-        """, (question_id,))
-        likes = await cursor.fetchall()
-        liked_by = [like['user_id'] for like in likes]
+        # Likers come back as a JSON array (NULL without likes)
+        liked_by = orjson.loads(question['liked_by']) if question['liked_by'] else []
         
         # Get attachments (currently not supported in this table structure)
         attachments = []
         
-        # Increment view count
-        await cursor.execute("""
-            UPDATE questions SET view_count = view_count + 1 WHERE id = %s
-        """, (question_id,))
+        # Count the view; it is written with the next flush
+        increment_question_views(question_id)
         
         question_data = {
             "id": question['id'],
@@ -933,7 +1263,7 @@ async def get_question(question_id: str):
             "attachments": attachments or [],
             "created_at": question['created_at'],
             "updated_at": question['updated_at'],
-            "view_count": question['view_count'] + 1,  # Updated count
+            "view_count": question['view_count'] + _pending_views[question_id],  # Including unflushed views
             "answer_count": question['answer_count'],
             "like_count": question['like_count'],
             "liked_by": liked_by
@@ -942,81 +1272,66 @@ async def get_question(question_id: str):
         return question_data
 
 # Like/Unlike question endpoints
+# like_count is updated through LAST_INSERT_ID(expr), so the new count comes
+# back in the UPDATE's OK packet (cursor.lastrowid) without another SELECT
 @api_router.post("/questions/{question_id}/like")
 async def like_question(question_id: str, current_user: User = Depends(get_current_user)):
-    async with get_db_connection() as cursor:
-        # Check if question exists
-        await cursor.execute("SELECT * FROM questions WHERE id = %s", (question_id,))
-        question = await cursor.fetchone()
-        if not question:
-            raise HTTPException(status_code=404, detail="Soru bulunamadı")
-        
-        # Check if already liked
+    async with get_db_transaction() as cursor:
+        # Add like first (same lock order as unlike); the (question_id, user_id)
+        # primary key rejects a second one
         await cursor.execute(
-            "SELECT * FROM question_likes WHERE question_id = %s AND user_id = %s",
+            "INSERT IGNORE INTO question_likes (question_id, user_id) VALUES (%s, %s)",
             (question_id, current_user.id)
         )
-        existing_like = await cursor.fetchone()
-        
-        if existing_like:
+        if cursor.rowcount == 0:
+            # Nothing added: tell a missing question from an existing like
+            await cursor.execute("SELECT id FROM questions WHERE id = %s", (question_id,))
+            if not await cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Soru bulunamadı")
             raise HTTPException(status_code=400, detail="Bu soruyu zaten beğenmişsiniz")
         
-        # Add like
+        # Count the like; no matching row means the question does not exist
         await cursor.execute(
-            "INSERT INTO question_likes (question_id, user_id) VALUES (%s, %s)",
-            (question_id, current_user.id)
-        )
-        
-        # Get new like count
-        await cursor.execute(
-            "SELECT COUNT(*) as like_count FROM question_likes WHERE question_id = %s",
+            "UPDATE questions SET like_count = LAST_INSERT_ID(like_count + 1) WHERE id = %s",
             (question_id,)
         )
-        like_count = await cursor.fetchone()
+        if cursor.rowcount == 0:
+            # Raising rolls the like row back
+            raise HTTPException(status_code=404, detail="Soru bulunamadı")
+        like_count = cursor.lastrowid
         
         # NO NOTIFICATION for question likes (as requested by user)
         
         return {
             "message": "Soru beğenildi",
-            "like_count": like_count['like_count'],
+            "like_count": like_count,
             "liked": True
         }
 
 @api_router.delete("/questions/{question_id}/like")
 async def unlike_question(question_id: str, current_user: User = Depends(get_current_user)):
-    async with get_db_connection() as cursor:
-        # Check if question exists
-        await cursor.execute("SELECT * FROM questions WHERE id = %s", (question_id,))
-        question = await cursor.fetchone()
-        if not question:
-            raise HTTPException(status_code=404, detail="Soru bulunamadı")
-        
-        # Check if liked
-        await cursor.execute(
-            "SELECT * FROM question_likes WHERE question_id = %s AND user_id = %s",
-            (question_id, current_user.id)
-        )
-        existing_like = await cursor.fetchone()
-        
-        if not existing_like:
-            raise HTTPException(status_code=400, detail="Bu soruyu beğenmemişsiniz")
-        
+    async with get_db_transaction() as cursor:
         # Remove like
         await cursor.execute(
             "DELETE FROM question_likes WHERE question_id = %s AND user_id = %s",
             (question_id, current_user.id)
         )
+        if cursor.rowcount == 0:
+            # Nothing removed: tell a missing question from a missing like
+            await cursor.execute("SELECT id FROM questions WHERE id = %s", (question_id,))
+            if not await cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Soru bulunamadı")
+            raise HTTPException(status_code=400, detail="Bu soruyu beğenmemişsiniz")
         
-        # Get new like count
+        # Keep the question's like_count in step
         await cursor.execute(
-            "SELECT COUNT(*) as like_count FROM question_likes WHERE question_id = %s",
+            "UPDATE questions SET like_count = LAST_INSERT_ID(like_count - 1) WHERE id = %s",
             (question_id,)
         )
-        like_count = await cursor.fetchone()
         
         return {
             "message": "Soru beğenisi kaldırıldı",
-            "like_count": like_count['like_count'],
+            "like_count": cursor.lastrowid,
             "liked": False
         }
 
@@ -1038,6 +1353,7 @@ async def delete_question(question_id: str, current_user: User = Depends(get_cur
         
         # Simple delete (let foreign keys cascade)
         await cursor.execute("DELETE FROM questions WHERE id = %s", (question_id,))
+        _question_count_cache.clear()
         
         return {"success": True, "message": "Soru silindi"}
 
@@ -1050,15 +1366,6 @@ async def create_answer(
     answer_data: AnswerCreate,
     current_user: User = Depends(get_current_user)
 ):
-    # Check rate limit
-    can_post, seconds_remaining = check_rate_limit(current_user)
-    if not can_post:
-        time_remaining = format_time_remaining(seconds_remaining)
-        raise HTTPException(
-            status_code=429, 
-            detail=f"Çok sık cevap veriyorsunuz. {time_remaining} sonra tekrar deneyebilirsiniz."
-        )
-    
     # Check if user is muted
     if hasattr(current_user, 'is_currently_muted') and current_user.is_currently_muted:
         mute_until = current_user.mute_until.strftime('%d.%m.%Y %H:%M') if current_user.mute_until else 'bilinmiyor'
@@ -1075,9 +1382,9 @@ async def create_answer(
             detail=f"Cevabınızda uygunsuz kelime tespit edildi: '{found_word}'. Lütfen saygılı bir dil kullanın."
         )
     
-    async with get_db_connection() as cursor:
+    async with get_db_transaction() as cursor:
         # Check if question exists
-        await cursor.execute("SELECT * FROM questions WHERE id = %s", (question_id,))
+        await cursor.execute("SELECT author_id, title FROM questions WHERE id = %s", (question_id,))
         question = await cursor.fetchone()
         if not question:
             raise HTTPException(status_code=404, detail="Soru bulunamadı")
@@ -1085,16 +1392,25 @@ async def create_answer(
         # Extract mentions from answer content
         mentioned_users = extract_mentions(answer_data.content)
         
-        answer_id = str(uuid.uuid4())
+        answer_id = new_id()
         now = datetime.now(timezone.utc)
         
+        # Check rate limit (and record this post's time)
+        can_post, seconds_remaining = await check_rate_limit(cursor, current_user, "last_answer_at", now)
+        if not can_post:
+            time_remaining = format_time_remaining(seconds_remaining)
+            raise HTTPException(
+                status_code=429, 
+                detail=f"Çok sık cevap veriyorsunuz. {time_remaining} sonra tekrar deneyebilirsiniz."
+            )
+        
         # Create answer
         await cursor.execute("""
             INSERT INTO answers 
             (id, question_id, content, author_id, author_username, mentioned_users)
             VALUES (%s, %s, %s, %s, %s, %s)
         """, (answer_id, question_id, answer_data.content, current_user.id,
-              current_user.username, json.dumps(mentioned_users)))
+              current_user.username, orjson.dumps(mentioned_users).decode()))
         
         # Update question answer count
         await cursor.execute(
@@ -1102,15 +1418,9 @@ async def create_answer(
             (question_id,)
         )
         
-        # Update user's last answer timestamp
-        await cursor.execute(
-            "UPDATE users SET last_answer_at = %s WHERE id = %s",
-            (now, current_user.id)
-        )
-        
         # Create notification for question author (if not self-answering)
         if question['author_id'] != current_user.id:
-            await create_notification(
+            create_notification(
                 user_id=question['author_id'],
                 notification_type="answer",
                 title="Sorunuza yeni cevap",
@@ -1121,13 +1431,18 @@ async def create_answer(
                 related_answer_id=answer_id
             )
         
-        # Create notifications for mentioned users
-        for mentioned_username in mentioned_users:
-            await cursor.execute("SELECT id FROM users WHERE username = %s", (mentioned_username,))
-            mentioned_user = await cursor.fetchone()
-            if mentioned_user and mentioned_user['id'] != current_user.id:
-                await create_notification(
-                    user_id=mentioned_user['id'],
+        # Create notifications for mentioned users (looked up in one query)
+        mentioned_ids = []
+        if mentioned_users:
+            placeholders = ", ".join(["%s"] * len(mentioned_users))
+            await cursor.execute(
+                f"SELECT id FROM users WHERE username IN ({placeholders})", mentioned_users
+            )
+            mentioned_ids = [row['id'] for row in await cursor.fetchall()]
+        for mentioned_id in mentioned_ids:
+            if mentioned_id != current_user.id:
+                create_notification(
+                    user_id=mentioned_id,
                     notification_type="mention",
                     title="Bir cevapta etiketlendiniz",
                     message=f"{current_user.username} sizi bir cevapta etiketledi",
@@ -1147,8 +1462,10 @@ async def create_answer(
             created_at=now,
             updated_at=now
         )
-        
-        return answer
+    # Only after COMMIT, so a rolled-back post does not rate-limit the user
+    record_post(current_user.id)
+    
+    return answer
 
 # Reply to answer endpoint
 @api_router.post("/answers/{answer_id}/replies")
@@ -1157,15 +1474,6 @@ async def create_reply(
     reply_data: AnswerCreate,
     current_user: User = Depends(get_current_user)
 ):
-    # Check rate limit
-    can_post, seconds_remaining = check_rate_limit(current_user)
-    if not can_post:
-        time_remaining = format_time_remaining(seconds_remaining)
-        raise HTTPException(
-            status_code=429, 
-            detail=f"Çok hızlı cevap veriyorsunuz. {time_remaining} sonra tekrar deneyin."
-        )
-    
     # Check if user is muted
     if hasattr(current_user, 'is_currently_muted') and current_user.is_currently_muted:
         mute_until = current_user.mute_until.strftime('%d.%m.%Y %H:%M') if current_user.mute_until else 'bilinmiyor'
@@ -1182,37 +1490,41 @@ async def create_reply(
             detail=f"Yanıtınızda uygunsuz kelime tespit edildi: '{found_word}'. Lütfen saygılı bir dil kullanın."
         )
     
-    async with get_db_connection() as cursor:
+    async with get_db_transaction() as cursor:
         # Check if parent answer exists
-        await cursor.execute("SELECT * FROM answers WHERE id = %s", (answer_id,))
+        await cursor.execute("SELECT author_id, question_id FROM answers WHERE id = %s", (answer_id,))
         parent_answer = await cursor.fetchone()
         if not parent_answer:
             raise HTTPException(status_code=404, detail="Cevap bulunamadı")
         
         # Create reply
-        reply_id = str(uuid.uuid4())
+        reply_id = new_id()
         now = datetime.now(timezone.utc)
         mentioned_users = extract_mentions(reply_data.content)
         
+        # Check rate limit (and record this post's time)
+        can_post, seconds_remaining = await check_rate_limit(cursor, current_user, "last_answer_at", now)
+        if not can_post:
+            time_remaining = format_time_remaining(seconds_remaining)
+            raise HTTPException(
+                status_code=429, 
+                detail=f"Çok hızlı cevap veriyorsunuz. {time_remaining} sonra tekrar deneyin."
+            )
+        
         await cursor.execute("""
             INSERT INTO answers (id, question_id, content, author_id, author_username, mentioned_users, parent_answer_id, created_at, updated_at)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (reply_id, parent_answer['question_id'], reply_data.content, current_user.id, current_user.username, 
-              json.dumps(mentioned_users), answer_id, now, now))
+              orjson.dumps(mentioned_users).decode(), answer_id, now, now))
         
         # Update parent answer reply count
         await cursor.execute("""
             UPDATE answers SET reply_count = reply_count + 1 WHERE id = %s
         """, (answer_id,))
         
-        # Update user's last answer time
-        await cursor.execute("""
-            UPDATE users SET last_answer_at = %s WHERE id = %s
-        """, (now, current_user.id))
-        
         # Create notification for parent answer author
         if parent_answer['author_id'] != current_user.id:
-            await create_notification(
+            create_notification(
                 user_id=parent_answer['author_id'],
                 notification_type="reply",
                 title="Cevabınıza yanıt geldi",
@@ -1234,8 +1546,10 @@ async def create_reply(
             created_at=now,
             updated_at=now
         )
-        
-        return reply
+    # Only after COMMIT, so a rolled-back post does not rate-limit the user
+    record_post(current_user.id)
+    
+    return reply
 
 # Get replies for an answer
 @api_router.get("/answers/{answer_id}/replies")
@@ -1260,7 +1574,7 @@ async def get_replies(answer_id: str):
 async def delete_answer(answer_id: str, current_user: User = Depends(get_current_user)):
     async with get_db_connection() as cursor:
         # Check if answer exists and user owns it
-        await cursor.execute("SELECT * FROM answers WHERE id = %s", (answer_id,))
+        await cursor.execute("SELECT author_id, parent_answer_id, question_id FROM answers WHERE id = %s", (answer_id,))
         answer = await cursor.fetchone()
         
         if not answer:
@@ -1269,18 +1583,20 @@ async def delete_answer(answer_id: str, current_user: User = Depends(get_current
         if answer['author_id'] != current_user.id and not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Bu cevabı silme yetkiniz yok")
         
-        # Delete all replies to this answer first
-        await cursor.execute("DELETE FROM answers WHERE parent_answer_id = %s", (answer_id,))
-        
-        # Delete the answer
+        # Delete the answer; its replies go with it (parent_answer_id ON DELETE CASCADE)
         await cursor.execute("DELETE FROM answers WHERE id = %s", (answer_id,))
         
-        # Update parent answer reply count if this was a reply
+        # Update the counter that create_answer/create_reply incremented
         if answer['parent_answer_id']:
             await cursor.execute("""
                 UPDATE answers SET reply_count = reply_count - 1 
                 WHERE id = %s AND reply_count > 0
             """, (answer['parent_answer_id'],))
+        else:
+            await cursor.execute("""
+                UPDATE questions SET answer_count = answer_count - 1 
+                WHERE id = %s AND answer_count > 0
+            """, (answer['question_id'],))
         
         return {"message": "Cevap başarıyla silindi"}
 
@@ -1297,56 +1613,75 @@ async def get_answers(question_id: str):
         
         answers_data = await cursor.fetchall()
         
+        # Rows come from our own database, so skip pydantic validation
         answers = []
         for a_data in answers_data:
             # Parse mentioned_users JSON
-            mentioned_users = json.loads(a_data['mentioned_users']) if a_data['mentioned_users'] else []
+            a_data['mentioned_users'] = orjson.loads(a_data['mentioned_users']) if a_data['mentioned_users'] else []
+            a_data['is_accepted'] = bool(a_data['is_accepted'])
             
-            answer = Answer(
-                **{**a_data, 'mentioned_users': mentioned_users}
-            )
+            answer = Answer.model_construct(**a_data)
             answers.append(answer)
         
         return {"answers": answers}
 
 # Leaderboard endpoint
+# Weekly leaderboard, reused across requests
+LEADERBOARD_CACHE_TTL = 60  # seconds
+_leaderboard_cache = TTLCache(1, LEADERBOARD_CACHE_TTL)
+
 @api_router.get("/leaderboard")
 async def get_leaderboard():
+    cached = _leaderboard_cache.get("weekly")
+    if cached is not None:
+        return cached
+    
     async with get_db_connection() as cursor:
+        # Count only the last 7 days' posts (idx_created_at ranges) per author,
+        # then join the few active authors to users
         await cursor.execute("""
             SELECT 
                 u.username,
                 u.university,
                 u.faculty,
-                COUNT(DISTINCT q.id) as question_count,
-                COUNT(DISTINCT a.id) as answer_count,
-                (COUNT(DISTINCT q.id) * 2 + COUNT(DISTINCT a.id)) as total_points
-            FROM users u
-            LEFT JOIN questions q ON u.id = q.author_id 
-                AND q.created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-            LEFT JOIN answers a ON u.id = a.author_id 
-                AND a.created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-            GROUP BY u.id, u.username, u.university, u.faculty
-            HAVING total_points > 0
+                s.question_count,
+                s.answer_count,
+                s.question_count * 2 + s.answer_count as total_points
+            FROM (
+                SELECT author_id,
+                       CAST(SUM(is_question) AS UNSIGNED) as question_count,
+                       CAST(SUM(1 - is_question) AS UNSIGNED) as answer_count
+                FROM (
+                    SELECT author_id, 1 as is_question FROM questions 
+                    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
+                    UNION ALL
+                    SELECT author_id, 0 as is_question FROM answers 
+                    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
+                ) recent
+                GROUP BY author_id
+            ) s
+            JOIN users u ON u.id = s.author_id
             ORDER BY total_points DESC, question_count DESC, u.username ASC
             LIMIT 7
         """)
         
         leaderboard_data = await cursor.fetchall()
-        
-        leaderboard = []
-        for i, user_data in enumerate(leaderboard_data, 1):
-            leaderboard.append({
-                "rank": i,
-                "username": user_data['username'],
-                "university": user_data['university'],
-                "faculty": user_data['faculty'],
-                "question_count": user_data['question_count'],
-                "answer_count": user_data['answer_count'],
-                "total_points": user_data['total_points']
-            })
-        
-        return {"leaderboard": leaderboard}
+    
+    leaderboard = []
+    for i, user_data in enumerate(leaderboard_data, 1):
+        leaderboard.append({
+            "rank": i,
+            "username": user_data['username'],
+            "university": user_data['university'],
+            "faculty": user_data['faculty'],
+            "question_count": user_data['question_count'],
+            "answer_count": user_data['answer_count'],
+            "total_points": user_data['total_points']
+        })
+    
+    response = {"leaderboard": leaderboard}
+    _leaderboard_cache.set("weekly", response)
+    return response
 
 # Notifications endpoints
 @api_router.get("/notifications")
@@ -1361,9 +1696,11 @@ async def get_notifications(current_user: User = Depends(get_current_user)):
         
         notifications_data = await cursor.fetchall()
         
+        # Rows come from our own database, so skip pydantic validation
         notifications = []
         for n_data in notifications_data:
-            notification = Notification(**n_data)
+            n_data['is_read'] = bool(n_data['is_read'])
+            notification = Notification.model_construct(**n_data)
             notifications.append(notification)
         
         return {"notifications": notifications}
@@ -1396,47 +1733,32 @@ async def mark_notification_read(
 # User Profile endpoint
 @api_router.get("/users/{user_id}/profile")
 async def get_user_profile(user_id: str):
-    async with get_db_connection() as cursor:
+    # The four queries are independent, so each runs on its own pooled connection
+    user_data, stats_data, recent_questions, recent_answers = await asyncio.gather(
         # Get user basic info
-        await cursor.execute("""
+        fetch_one("""
             SELECT id, username, email, university, faculty, department, created_at
             FROM users 
             WHERE id = %s
-        """, (user_id,))
-        
-        user_data = await cursor.fetchone()
-        
-        if not user_data:
-            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
-        
-        # Get user statistics
-        await cursor.execute("""
+        """, (user_id,)),
+        # Get user statistics (counted per table, not over a questions x answers join)
+        fetch_one("""
             SELECT 
-                COUNT(DISTINCT q.id) as question_count,
-                COUNT(DISTINCT a.id) as answer_count,
-                COALESCE(SUM(q.like_count), 0) as total_likes
-            FROM users u
-            LEFT JOIN questions q ON u.id = q.author_id
-            LEFT JOIN answers a ON u.id = a.author_id
-            WHERE u.id = %s
-            GROUP BY u.id
-        """, (user_id,))
-        
-        stats_data = await cursor.fetchone()
-        
+                (SELECT COUNT(*) FROM questions WHERE author_id = %s) as question_count,
+                (SELECT COUNT(*) FROM answers WHERE author_id = %s) as answer_count,
+                (SELECT CAST(COALESCE(SUM(like_count), 0) AS UNSIGNED) 
+                 FROM questions WHERE author_id = %s) as total_likes
+        """, (user_id, user_id, user_id)),
         # Get recent questions (last 5)
-        await cursor.execute("""
+        fetch_all("""
             SELECT id, title, category, created_at, answer_count
             FROM questions 
             WHERE author_id = %s 
             ORDER BY created_at DESC 
             LIMIT 5
-        """, (user_id,))
-        
-        recent_questions = await cursor.fetchall()
-        
+        """, (user_id,)),
         # Get recent answers (last 5)
-        await cursor.execute("""
+        fetch_all("""
             SELECT a.id, a.content, a.created_at, q.title as question_title, q.id as question_id
             FROM answers a
             JOIN questions q ON a.question_id = q.id
@@ -1444,38 +1766,50 @@ async def get_user_profile(user_id: str):
             ORDER BY a.created_at DESC 
             LIMIT 5
         """, (user_id,))
-        
-        recent_answers = await cursor.fetchall()
-        
-        profile = {
-            "user": {
-                "id": user_data['id'],
-                "username": user_data['username'],
-                "email": user_data['email'],
-                "university": user_data['university'],
-                "faculty": user_data['faculty'],
-                "department": user_data['department'],
-                "created_at": user_data['created_at']
-            },
-            "stats": {
-                "question_count": stats_data['question_count'] if stats_data else 0,
-                "answer_count": stats_data['answer_count'] if stats_data else 0,
-                "total_likes": stats_data['total_likes'] if stats_data else 0
-            },
-            "recent_questions": recent_questions or [],
-            "recent_answers": recent_answers or []
-        }
-        
-        return profile
+    )
+    
+    if not user_data:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    
+    profile = {
+        "user": {
+            "id": user_data['id'],
+            "username": user_data['username'],
+            "email": user_data['email'],
+            "university": user_data['university'],
+            "faculty": user_data['faculty'],
+            "department": user_data['department'],
+            "created_at": user_data['created_at']
+        },
+        "stats": {
+            "question_count": stats_data['question_count'] if stats_data else 0,
+            "answer_count": stats_data['answer_count'] if stats_data else 0,
+            "total_likes": stats_data['total_likes'] if stats_data else 0
+        },
+        "recent_questions": recent_questions or [],
+        "recent_answers": recent_answers or []
+    }
+    
+    return profile
 
 # File Upload endpoint
+UPLOAD_DIR = "/tmp/uploads"
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def open_upload_file(file_path: str):
+    """Create the uploads directory if needed and open file_path for writing"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    return open(file_path, "wb")
+
 @api_router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user)
 ):
-    # Validate file size (max 10MB)
-    if file.size > 10 * 1024 * 1024:
+    # Validate file size (max 10MB); size is unknown for chunked bodies and
+    # is checked again while streaming
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
         raise HTTPException(status_code=413, detail="Dosya boyutu çok büyük (maksimum 10MB)")
     
     # Validate file type
@@ -1490,24 +1824,32 @@ async def upload_file(
         raise HTTPException(status_code=400, detail="Desteklenmeyen dosya türü")
     
     # Generate unique filename
-    file_id = str(uuid.uuid4())
+    file_id = new_id()
     file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
     unique_filename = f"{file_id}.{file_extension}" if file_extension else file_id
     
-    # Create uploads directory if it doesn't exist
-    upload_dir = "/tmp/uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    
     # Save file
-    file_path = os.path.join(upload_dir, unique_filename)
+    file_path = os.path.join(UPLOAD_DIR, unique_filename)
     
+    # Stream to disk in chunks so the whole file is never held in memory;
+    # blocking file calls run in a worker thread to keep the event loop free
+    file_size = 0
     try:
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        with await asyncio.to_thread(open_upload_file, file_path) as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > UPLOAD_MAX_BYTES:
+                    break
+                await asyncio.to_thread(f.write, chunk)
     except Exception as e:
+        with suppress(OSError):
+            os.unlink(file_path)
         raise HTTPException(status_code=500, detail="Dosya kaydetme hatası")
     
+    if file_size > UPLOAD_MAX_BYTES:
+        os.unlink(file_path)
+        raise HTTPException(status_code=413, detail="Dosya boyutu çok büyük (maksimum 10MB)")
+    
     # Save file info to database
     async with get_db_connection() as cursor:
         await cursor.execute("""
@@ -1521,7 +1863,7 @@ async def upload_file(
             file.filename,
             file_path,
             file.content_type,
-            file.size,
+            file_size,
             current_user.id,
             datetime.now(timezone.utc)
         ))
@@ -1531,19 +1873,77 @@ async def upload_file(
         "filename": unique_filename,
         "original_filename": file.filename,
         "file_type": file.content_type,
-        "file_size": file.size,
+        "file_size": file_size,
         "upload_url": f"/uploads/{unique_filename}"
     }
 
+class UploadFileResponse(FileResponse):
+    """FileResponse that lets the server send the file itself when it can"""
+    # Fallback path: fewer thread hops per file than Starlette's 64KB reads
+    chunk_size = 1024 * 1024
+    
+    async def __call__(self, scope, receive, send):
+        # Servers offering the ASGI pathsend extension (Granian, Hypercorn)
+        # stream the file with sendfile instead of copying it through Python
+        if scope["method"] == "HEAD" or "http.response.pathsend" not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+        
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        if self.background is not None:
+            await self.background()
+
+# Small uploads are kept in memory; uploaded files are never rewritten
+# (names are fresh ids), so cached bytes cannot go stale
+UPLOAD_CACHE_MAX_FILE_BYTES = 1024 * 1024
+# Total budget for cached file contents per worker
+UPLOAD_CACHE_MAX_BYTES = 32 * 1024 * 1024
+UPLOAD_CACHE_CONTROL = "public, max-age=3600"
+# (content, etag, media_type), evicted by the bytes they hold
+_upload_cache = TTLCache(UPLOAD_CACHE_MAX_BYTES, sizeof=lambda entry: len(entry[0]))
+
+def read_upload_file(file_path: str) -> bytes:
+    """Read a whole uploaded file"""
+    with open(file_path, "rb") as f:
+        return f.read()
+
 # File serving endpoint  
 @api_router.get("/uploads/{filename}")
-async def serve_file(filename: str):
-    file_path = f"/tmp/uploads/{filename}"
+async def serve_file(filename: str, request: Request):
+    cached = _upload_cache.get(filename)
+    
+    if cached is None:
+        file_path = os.path.join(UPLOAD_DIR, filename)
+        
+        try:
+            stat_result = await asyncio.to_thread(os.stat, file_path)
+        except OSError:
+            raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+        
+        if stat_result.st_size > UPLOAD_CACHE_MAX_FILE_BYTES:
+            # Pass the stat result on so FileResponse does not stat the file again
+            return UploadFileResponse(
+                file_path, stat_result=stat_result, headers={"Cache-Control": UPLOAD_CACHE_CONTROL}
+            )
+        
+        try:
+            content = await asyncio.to_thread(read_upload_file, file_path)
+        except OSError:
+            raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+        
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        media_type = mimetypes.guess_type(filename)[0] or "text/plain"
+        cached = (content, etag, media_type)
+        _upload_cache.set(filename, cached)
+    
+    content, etag, media_type = cached
+    headers = {"ETag": etag, "Cache-Control": UPLOAD_CACHE_CONTROL}
     
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
     
-    return FileResponse(file_path)
+    return Response(content=content, media_type=media_type, headers=headers)
 
 # Admin endpoints
 @api_router.post("/admin/suspend-user/{user_id}")
@@ -1557,6 +1957,13 @@ async def suspend_user(
         raise HTTPException(status_code=403, detail="Admin yetkisi gerekli")
     
     async with get_db_connection() as cursor:
+        # Get user info
+        await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
+        user_info = await cursor.fetchone()
+        
+        if not user_info:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
         # Calculate suspend until date
         suspend_until = datetime.now(timezone.utc) + timedelta(days=suspend_days)
         
@@ -1566,26 +1973,17 @@ async def suspend_user(
             SET is_suspended = TRUE, suspend_until = %s, suspend_reason = %s 
             WHERE id = %s
         """, (suspend_until, reason, user_id))
-        
-        # Get user info
-        await cursor.execute("SELECT username, email FROM users WHERE id = %s", (user_id,))
-        user_info = await cursor.fetchone()
-        
-        if not user_info:
-            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        invalidate_user_cache(user_id)
         
         # Create notification for suspended user
-        notification_id = str(uuid.uuid4())
-        await cursor.execute("""
-            INSERT INTO notifications (id, user_id, message, type, created_at) 
-            VALUES (%s, %s, %s, %s, %s)
-        """, (
-            notification_id,
+        create_notification(
             user_id,
+            "mention",  # Using mention as closest type
+            "⛔ Hesap Askıya Alındı",
             f"Hesabınız {suspend_days} gün süreyle askıya alınmıştır. Sebep: {reason}. Askı süresi: {suspend_until.strftime('%d.%m.%Y %H:%M')}",
-            "suspend",
-            datetime.now(timezone.utc)
-        ))
+            current_user.id,
+            current_user.username
+        )
         
         return {"message": f"Kullanıcı {suspend_days} gün askıya alındı", "user": user_info['username']}
 
@@ -1595,12 +1993,6 @@ async def unsuspend_user(user_id: str, current_user: User = Depends(get_current_
         raise HTTPException(status_code=403, detail="Admin yetkisi gerekli")
     
     async with get_db_connection() as cursor:
-        await cursor.execute("""
-            UPDATE users 
-            SET is_suspended = FALSE, suspend_until = NULL, suspend_reason = NULL 
-            WHERE id = %s
-        """, (user_id,))
-        
         # Get user info
         await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
         user_info = await cursor.fetchone()
@@ -1608,18 +2000,22 @@ async def unsuspend_user(user_id: str, current_user: User = Depends(get_current_
         if not user_info:
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
-        # Create notification
-        notification_id = str(uuid.uuid4())
         await cursor.execute("""
-            INSERT INTO notifications (id, user_id, message, type, created_at) 
-            VALUES (%s, %s, %s, %s, %s)
-        """, (
-            notification_id,
+            UPDATE users 
+            SET is_suspended = FALSE, suspend_until = NULL, suspend_reason = NULL 
+            WHERE id = %s
+        """, (user_id,))
+        invalidate_user_cache(user_id)
+        
+        # Create notification
+        create_notification(
             user_id,
+            "mention",  # Using mention as closest type
+            "✅ Hesap Askısı Kaldırıldı",
             "Hesabınızın askısı kaldırılmıştır. Artık normal şekilde platform kullanabilirsiniz.",
-            "unsuspend",
-            datetime.now(timezone.utc)
-        ))
+            current_user.id,
+            current_user.username
+        )
         
         return {"message": "Kullanıcının askısı kaldırıldı", "user": user_info['username']}
 
@@ -1628,7 +2024,7 @@ async def delete_user(user_id: str, current_user: User = Depends(get_current_use
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin yetkisi gerekli")
     
-    async with get_db_connection() as cursor:
+    async with get_db_transaction() as cursor:
         # Get user info first
         await cursor.execute("SELECT username, email FROM users WHERE id = %s", (user_id,))
         user_info = await cursor.fetchone()
@@ -1637,7 +2033,8 @@ async def delete_user(user_id: str, current_user: User = Depends(get_current_use
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
         # Delete user (CASCADE will handle related data)
-        await cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        await delete_user_row(cursor, user_id)
+        invalidate_user_cache(user_id)
         
         return {"message": f"Kullanıcı {user_info['username']} silindi"}
 
@@ -1656,6 +2053,7 @@ async def admin_delete_question(question_id: str, current_user: User = Depends(g
         
         # Delete question (CASCADE will handle answers, likes, etc.)
         await cursor.execute("DELETE FROM questions WHERE id = %s", (question_id,))
+        _question_count_cache.clear()
         
         return {"success": True, "message": f"Soru '{question['title']}' admin tarafından silindi"}
 
@@ -1714,17 +2112,24 @@ async def search_users(
     search_term = f"%{q.strip()}%"
     
     async with get_db_connection() as cursor:
+        # Pick the 20 users first so the per-author counts (idx_author_created
+        # range scans) run only for the rows returned, not for every match
         await cursor.execute("""
             SELECT 
-                id, username, email, university, faculty, department,
-                is_admin, is_suspended, suspend_until, suspend_reason,
-                is_muted, mute_until, created_at,
+                u.*,
                 (SELECT COUNT(*) FROM questions WHERE author_id = u.id) as question_count,
                 (SELECT COUNT(*) FROM answers WHERE author_id = u.id) as answer_count
-            FROM users u
-            WHERE (username LIKE %s OR email LIKE %s OR university LIKE %s)
-            ORDER BY is_admin DESC, created_at DESC
-            LIMIT 20
+            FROM (
+                SELECT 
+                    id, username, email, university, faculty, department,
+                    is_admin, is_suspended, suspend_until, suspend_reason,
+                    is_muted, mute_until, created_at
+                FROM users
+                WHERE (username LIKE %s OR email LIKE %s OR university LIKE %s)
+                ORDER BY is_admin DESC, created_at DESC
+                LIMIT 20
+            ) u
+            ORDER BY u.is_admin DESC, u.created_at DESC
         """, (search_term, search_term, search_term))
         
         users = await cursor.fetchall()
@@ -1738,6 +2143,7 @@ async def make_admin(user_id: str, current_user: User = Depends(get_current_user
     
     async with get_db_connection() as cursor:
         await cursor.execute("UPDATE users SET is_admin = TRUE WHERE id = %s", (user_id,))
+        invalidate_user_cache(user_id)
         
         # Get user info
         await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
@@ -1770,20 +2176,14 @@ async def warn_user(
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
         # Create warning notification
-        notification_id = str(uuid.uuid4())
-        await cursor.execute("""
-            INSERT INTO notifications (id, user_id, type, title, message, from_user_id, from_username, created_at) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            notification_id,
+        create_notification(
             user_id,
             "mention",  # Using mention as closest type for admin warning
             "🚨 YÖNETİCİ UYARISI",
             f"🚨 YÖNETİCİ UYARISI: {warning_message}",
             current_user.id,
-            current_user.username,
-            datetime.now(timezone.utc)
-        ))
+            current_user.username
+        )
         
         return {"message": f"{user_info['username']} kullanıcısına uyarı gönderildi"}
 
@@ -1801,6 +2201,13 @@ async def mute_user(
         raise HTTPException(status_code=400, detail="Geçerli bir saat sayısı girin")
     
     async with get_db_connection() as cursor:
+        # Get user info
+        await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
+        user_info = await cursor.fetchone()
+        
+        if not user_info:
+            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        
         # Calculate mute until time
         mute_until = datetime.now(timezone.utc) + timedelta(hours=mute_hours)
         
@@ -1810,29 +2217,17 @@ async def mute_user(
             SET is_muted = TRUE, mute_until = %s 
             WHERE id = %s
         """, (mute_until, user_id))
-        
-        # Get user info
-        await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
-        user_info = await cursor.fetchone()
-        
-        if not user_info:
-            raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+        invalidate_user_cache(user_id)
         
         # Create notification
-        notification_id = str(uuid.uuid4())
-        await cursor.execute("""
-            INSERT INTO notifications (id, user_id, type, title, message, from_user_id, from_username, created_at) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            notification_id,
+        create_notification(
             user_id,
             "mention",  # Using mention as closest type
             "🔇 Hesap Susturuldu",
             f"🔇 Hesabınız {mute_hours} saat süreyle sessize alınmıştır. Bu süre içinde soru, cevap veya yanıt gönderemezsiniz. Susturma süresi: {mute_until.strftime('%d.%m.%Y %H:%M')}",
             current_user.id,
-            current_user.username,
-            datetime.now(timezone.utc)
-        ))
+            current_user.username
+        )
         
         return {"message": f"{user_info['username']} kullanıcısı {mute_hours} saat susturuldu"}
 
@@ -1841,7 +2236,7 @@ async def ban_user(user_id: str, current_user: User = Depends(get_current_user))
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin yetkisi gerekli")
     
-    async with get_db_connection() as cursor:
+    async with get_db_transaction() as cursor:
         # Get user info first
         await cursor.execute("SELECT username FROM users WHERE id = %s", (user_id,))
         user_info = await cursor.fetchone()
@@ -1850,7 +2245,8 @@ async def ban_user(user_id: str, current_user: User = Depends(get_current_user))
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
         # Delete user completely (CASCADE will handle related data)
-        await cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        await delete_user_row(cursor, user_id)
+        invalidate_user_cache(user_id)
         
         return {"message": f"{user_info['username']} hesabı yasaklandı ve silindi"}
 
@@ -1870,6 +2266,7 @@ async def setup_admin():
             UPDATE users SET is_admin = TRUE 
             WHERE username = 'superadmin' OR email = 'admin@unisoruyor.com'
         """)
+        _user_cache.clear()
         
 # PUBLIC: One-time admin setup (artez71)
 # MANUAL: Create admin account endpoint
@@ -1888,11 +2285,8 @@ async def create_admin_account():
                 return {"success": False, "message": "Admin hesabı zaten mevcut"}
             
             # Create admin
-            from passlib.context import CryptContext
-            pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-            
-            admin_id = str(uuid.uuid4())
-            hashed_password = pwd_context.hash("Admin123456!")
+            admin_id = new_id()
+            hashed_password = await asyncio.to_thread(get_password_hash, "Admin123456!")
             
             await cursor.execute("""
                 INSERT INTO users (
@@ -1935,11 +2329,8 @@ async def create_default_admin():
             admin_exists = await cursor.fetchone()
             
             if not admin_exists:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                
-                admin_id = str(uuid.uuid4())
-                hashed_password = pwd_context.hash("Admin123456!")
+                admin_id = new_id()
+                hashed_password = await asyncio.to_thread(get_password_hash, "Admin123456!")
                 
                 await cursor.execute("""
                     INSERT INTO users (
@@ -1970,12 +2361,29 @@ async def create_default_admin():
         print(f"❌ Error creating default admin: {e}")
         return False
 
-# Startup event to create default admin
+# Startup event to open the pool and create default admin
 @app.on_event("startup")
 async def startup_event():
-    """Create default admin on startup"""
+    """Open the database pool, start the notification and view writers and create default admin on startup"""
+    await init_db_pool()
+    app.state.notification_flush_task = asyncio.create_task(flush_notifications_periodically())
+    app.state.view_flush_task = asyncio.create_task(flush_views_periodically())
     await create_default_admin()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write pending notifications and view counts and close the database pool"""
+    app.state.notification_flush_task.cancel()
+    app.state.view_flush_task.cancel()
+    # Let a flush that was in progress hand its rows back before the final one
+    with suppress(asyncio.CancelledError):
+        await app.state.notification_flush_task
+    with suppress(asyncio.CancelledError):
+        await app.state.view_flush_task
+    await flush_notifications()
+    await flush_views()
+    await close_db_pool()
+
 app.include_router(api_router)
 
 if __name__ == "__main__":
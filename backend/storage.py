@@ -1,15 +1,37 @@
 """
 Supabase Storage helper functions
 """
+import asyncio
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from supabase_client import supabase_admin
+from cache import TTLCache
+
+BUCKETS = ("avatars", "question-attachments", "answer-attachments")
+
+# Attachment listing URLs are valid for an hour; reuse them for 50 minutes
+ATTACHMENT_URL_EXPIRES_IN = 3600  # seconds
+SIGNED_URL_CACHE_TTL = 3000  # seconds
+SIGNED_URL_CACHE_MAX_SIZE = 10000
+_signed_url_cache = TTLCache(SIGNED_URL_CACHE_MAX_SIZE, SIGNED_URL_CACHE_TTL)
 
 class Storage:
-    """Storage operations using Supabase Storage"""
+    """Storage operations using Supabase Storage
+    
+    The Supabase client is synchronous, so its requests run via
+    asyncio.to_thread to keep the event loop free"""
     
     def __init__(self):
         self.storage = supabase_admin.storage
+        # Bucket handles only wrap the shared client, so build them once
+        self.buckets = {name: self.storage.from_(name) for name in BUCKETS}
+    
+    def bucket(self, name: str):
+        """Return the handle for a storage bucket"""
+        handle = self.buckets.get(name)
+        if handle is None:
+            handle = self.buckets[name] = self.storage.from_(name)
+        return handle
     
     async def upload_avatar(self, user_id: str, file_content: bytes, filename: str, content_type: str) -> Dict[str, Any]:
         """Upload user avatar to Supabase Storage"""
@@ -17,7 +39,8 @@ class Storage:
             file_path = f"{user_id}/{filename}"
             
             # Upload to avatars bucket
-            result = self.storage.from_("avatars").upload(
+            result = await asyncio.to_thread(
+                self.bucket("avatars").upload,
                 file_path,
                 file_content,
                 {
@@ -27,7 +50,7 @@ class Storage:
             )
             
             # Get public URL
-            public_url = self.storage.from_("avatars").get_public_url(file_path)
+            public_url = self.bucket("avatars").get_public_url(file_path)
             
             return {
                 "success": True,
@@ -53,14 +76,16 @@ class Storage:
             file_path = f"{user_id}/{question_id}/{filename}"
             
             # Upload to question-attachments bucket
-            result = self.storage.from_("question-attachments").upload(
+            result = await asyncio.to_thread(
+                self.bucket("question-attachments").upload,
                 file_path,
                 file_content,
                 {"content-type": content_type}
             )
             
             # Create signed URL (valid for 24 hours)
-            signed_url_data = self.storage.from_("question-attachments").create_signed_url(
+            signed_url_data = await asyncio.to_thread(
+                self.bucket("question-attachments").create_signed_url,
                 file_path,
                 86400  # 24 hours
             )
@@ -90,14 +115,16 @@ class Storage:
             file_path = f"{user_id}/{answer_id}/{filename}"
             
             # Upload to answer-attachments bucket
-            result = self.storage.from_("answer-attachments").upload(
+            result = await asyncio.to_thread(
+                self.bucket("answer-attachments").upload,
                 file_path,
                 file_content,
                 {"content-type": content_type}
             )
             
             # Create signed URL (valid for 24 hours)
-            signed_url_data = self.storage.from_("answer-attachments").create_signed_url(
+            signed_url_data = await asyncio.to_thread(
+                self.bucket("answer-attachments").create_signed_url,
                 file_path,
                 86400  # 24 hours
             )
@@ -120,20 +147,17 @@ class Storage:
             folder_path = f"{user_id}/{question_id}"
             
             # List files in folder
-            files = self.storage.from_("question-attachments").list(folder_path)
+            files = await asyncio.to_thread(self.bucket("question-attachments").list, folder_path)
+            
+            # Sign all files with one request instead of one per file
+            urls = await self.get_attachment_urls([f"{folder_path}/{file['name']}" for file in files])
             
             attachments = []
-            for file in files:
-                # Create signed URL
-                signed_url_data = self.storage.from_("question-attachments").create_signed_url(
-                    f"{folder_path}/{file['name']}",
-                    3600  # 1 hour
-                )
-                
+            for file, url in zip(files, urls):
                 attachments.append({
                     "name": file["name"],
                     "size": file.get("metadata", {}).get("size", 0),
-                    "url": signed_url_data.get("signedURL")
+                    "url": url
                 })
             
             return attachments
@@ -141,10 +165,59 @@ class Storage:
             print(f"Error getting attachments: {str(e)}")
             return []
     
+    async def get_attachment_urls(self, file_paths: List[str]) -> List[Optional[str]]:
+        """Return signed URLs for question attachments, reusing cached ones and
+        signing the rest in a single request"""
+        urls = {}
+        for file_path in file_paths:
+            cached = _signed_url_cache.get(file_path)
+            if cached:
+                urls[file_path] = cached
+        
+        missing = {file_path for file_path in file_paths if file_path not in urls}
+        if missing:
+            signed = await asyncio.to_thread(self._sign_attachments, list(missing))
+            # Results are matched by path, not position; items with an error
+            # (e.g. a file deleted since the listing) get no URL
+            for item in signed:
+                file_path = item.get("path")
+                url = item.get("signedURL")
+                if item.get("error") or not url or file_path not in missing:
+                    continue
+                urls[file_path] = url
+                _signed_url_cache.set(file_path, url)
+        
+        return [urls.get(file_path) for file_path in file_paths]
+    
+    def _sign_attachments(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """Sign question attachment paths in one request
+        
+        Some storage3 versions raise for the whole batch when one item has no
+        signedURL; the paths are then signed one by one so a single missing
+        file only loses its own URL.
+        """
+        bucket = self.bucket("question-attachments")
+        try:
+            return bucket.create_signed_urls(file_paths, ATTACHMENT_URL_EXPIRES_IN)
+        except Exception as e:
+            print(f"Error signing attachments in batch: {str(e)}")
+        
+        signed = []
+        for file_path in file_paths:
+            try:
+                signed_url_data = bucket.create_signed_url(file_path, ATTACHMENT_URL_EXPIRES_IN)
+            except Exception as e:
+                signed.append({"path": file_path, "signedURL": None, "error": str(e)})
+                continue
+            signed.append({"path": file_path, "signedURL": signed_url_data.get("signedURL"), "error": None})
+        return signed
+    
     async def delete_file(self, bucket: str, file_path: str) -> bool:
         """Delete a file from storage"""
         try:
-            self.storage.from_(bucket).remove([file_path])
+            await asyncio.to_thread(self.bucket(bucket).remove, [file_path])
+            if bucket == "question-attachments":
+                _signed_url_cache.pop(file_path, None)
             return True
         except Exception as e:
             print(f"Error deleting file: {str(e)}")
@@ -6,6 +6,8 @@ CREATE DATABASE IF NOT EXISTS unisoruyor;
 USE unisoruyor;
 
 -- Users Table
+-- Authenticated requests look users up by id; InnoDB stores the row in the
+-- primary key's clustered index, so that lookup needs no extra index.
 CREATE TABLE users (
     id VARCHAR(36) PRIMARY KEY,
     username VARCHAR(50) UNIQUE NOT NULL,
@@ -15,6 +17,11 @@ CREATE TABLE users (
     department VARCHAR(100) NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     is_admin BOOLEAN DEFAULT FALSE,
+    is_suspended BOOLEAN DEFAULT FALSE,
+    suspend_until TIMESTAMP NULL,
+    suspend_reason VARCHAR(255) NULL,
+    is_muted BOOLEAN DEFAULT FALSE,
+    mute_until TIMESTAMP NULL,
     last_question_at TIMESTAMP NULL,
     last_answer_at TIMESTAMP NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -25,6 +32,10 @@ CREATE TABLE users (
 );
 
 -- Questions Table
+-- like_count mirrors question_likes and is kept in step by the like/unlike
+-- and user deletion endpoints. Databases created before that need a one-time
+-- UPDATE questions q SET like_count =
+--     (SELECT COUNT(*) FROM question_likes ql WHERE ql.question_id = q.id);
 CREATE TABLE questions (
     id VARCHAR(36) PRIMARY KEY,
     title VARCHAR(255) NOT NULL,
@@ -41,8 +52,8 @@ CREATE TABLE questions (
     answer_count INT DEFAULT 0,
     like_count INT DEFAULT 0,
     FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_author_id (author_id),
-    INDEX idx_category (category),
+    INDEX idx_author_created (author_id, created_at),
+    INDEX idx_category_created (category, created_at),
     INDEX idx_created_at (created_at),
     INDEX idx_university (author_university),
     FULLTEXT idx_search (title, content)
@@ -64,9 +75,9 @@ CREATE TABLE answers (
     FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE,
     FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (parent_answer_id) REFERENCES answers(id) ON DELETE CASCADE,
-    INDEX idx_question_id (question_id),
-    INDEX idx_author_id (author_id),
-    INDEX idx_parent_answer_id (parent_answer_id),
+    INDEX idx_question_created (question_id, created_at),
+    INDEX idx_author_created (author_id, created_at),
+    INDEX idx_parent_answer_created (parent_answer_id, created_at),
     INDEX idx_created_at (created_at)
 );
 
@@ -131,7 +142,21 @@ CREATE TABLE notifications (
     FOREIGN KEY (from_user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (related_question_id) REFERENCES questions(id) ON DELETE CASCADE,
     FOREIGN KEY (related_answer_id) REFERENCES answers(id) ON DELETE CASCADE,
-    INDEX idx_user_id (user_id),
-    INDEX idx_is_read (is_read),
+    INDEX idx_user_created (user_id, created_at),
+    INDEX idx_user_is_read (user_id, is_read),
     INDEX idx_created_at (created_at)
-);
\ No newline at end of file
+);
+
+-- =========================================
+-- Index migration for databases created with the earlier single-column indexes
+-- =========================================
+-- ALTER TABLE questions
+--     ADD INDEX idx_author_created (author_id, created_at), DROP INDEX idx_author_id,
+--     ADD INDEX idx_category_created (category, created_at), DROP INDEX idx_category;
+-- ALTER TABLE answers
+--     ADD INDEX idx_question_created (question_id, created_at), DROP INDEX idx_question_id,
+--     ADD INDEX idx_author_created (author_id, created_at), DROP INDEX idx_author_id,
+--     ADD INDEX idx_parent_answer_created (parent_answer_id, created_at), DROP INDEX idx_parent_answer_id;
+-- ALTER TABLE notifications
+--     ADD INDEX idx_user_created (user_id, created_at), DROP INDEX idx_user_id,
+--     ADD INDEX idx_user_is_read (user_id, is_read), DROP INDEX idx_is_read;
\ No newline at end of file
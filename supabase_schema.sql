@@ -51,8 +51,11 @@ CREATE INDEX IF NOT EXISTS idx_questions_category ON public.questions(category);
 CREATE INDEX IF NOT EXISTS idx_questions_created_at ON public.questions(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_questions_university ON public.questions(author_university);
 
--- Full-text search index for questions
-CREATE INDEX IF NOT EXISTS idx_questions_search ON public.questions USING GIN(to_tsvector('turkish', title || ' ' || content));
+-- Full-text search column and index for questions
+ALTER TABLE public.questions ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('turkish', coalesce(title, '') || ' ' || coalesce(content, ''))) STORED;
+DROP INDEX IF EXISTS idx_questions_search;
+CREATE INDEX IF NOT EXISTS idx_questions_search ON public.questions USING GIN(search_tsv);
 
 -- Answers Table
 CREATE TABLE IF NOT EXISTS public.answers (
@@ -254,12 +257,147 @@ CREATE TRIGGER trigger_decrement_answer_count
     AFTER DELETE ON public.answers
     FOR EACH ROW EXECUTE FUNCTION decrement_answer_count();
 
+-- =========================================
+-- RPC Functions
+-- =========================================
+
+-- Leaderboard: question/answer counts aggregated in a single query
+CREATE OR REPLACE FUNCTION get_leaderboard(lim INTEGER DEFAULT 7)
+RETURNS TABLE (
+    username VARCHAR,
+    university VARCHAR,
+    faculty VARCHAR,
+    department VARCHAR,
+    question_count BIGINT,
+    answer_count BIGINT,
+    total_contributions BIGINT
+) AS $$
+    SELECT u.username, u.university, u.faculty, u.department,
+           COALESCE(q.c, 0) AS question_count,
+           COALESCE(a.c, 0) AS answer_count,
+           COALESCE(q.c, 0) + COALESCE(a.c, 0) AS total_contributions
+    FROM public.users u
+    LEFT JOIN (
+        SELECT author_id, COUNT(*) AS c FROM public.questions GROUP BY author_id
+    ) q ON q.author_id = u.id
+    LEFT JOIN (
+        SELECT author_id, COUNT(*) AS c FROM public.answers GROUP BY author_id
+    ) a ON a.author_id = u.id
+    WHERE COALESCE(q.c, 0) + COALESCE(a.c, 0) > 0
+    ORDER BY total_contributions DESC, u.username ASC
+    LIMIT lim;
+$$ LANGUAGE sql STABLE;
+
+-- User profile: user row, stats and recent activity in a single call
+CREATE OR REPLACE FUNCTION get_user_profile(uid UUID)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'user', json_build_object(
+            'id', u.id,
+            'username', u.username,
+            'email', u.email,
+            'university', u.university,
+            'faculty', u.faculty,
+            'department', u.department,
+            'created_at', u.created_at
+        ),
+        'stats', json_build_object(
+            'question_count', (SELECT COUNT(*) FROM public.questions WHERE author_id = uid),
+            'answer_count', (SELECT COUNT(*) FROM public.answers WHERE author_id = uid)
+        ),
+        'recent_questions', (
+            SELECT COALESCE(json_agg(q), '[]'::json) FROM (
+                SELECT id, title, content, author_id, author_username, author_university,
+                       author_faculty, author_department, category, created_at, updated_at,
+                       view_count, answer_count, like_count
+                FROM public.questions WHERE author_id = uid
+                ORDER BY created_at DESC LIMIT 5
+            ) q
+        ),
+        'recent_answers', (
+            SELECT COALESCE(json_agg(a), '[]'::json) FROM (
+                SELECT * FROM public.answers WHERE author_id = uid
+                ORDER BY created_at DESC LIMIT 5
+            ) a
+        )
+    )
+    FROM public.users u
+    WHERE u.id = uid;
+$$ LANGUAGE sql STABLE;
+
+-- Rate limit: TRUE when the last action of this type is at least 2 minutes old
+CREATE OR REPLACE FUNCTION can_perform(uid UUID, action TEXT)
+RETURNS BOOLEAN AS $$
+    SELECT COALESCE(
+        NOW() - CASE action
+            WHEN 'question' THEN last_question_at
+            WHEN 'answer' THEN last_answer_at
+        END >= INTERVAL '2 minutes',
+        TRUE
+    )
+    FROM public.users
+    WHERE id = uid;
+$$ LANGUAGE sql STABLE;
+
+-- Apply buffered view counts in one statement (qids[i] gets counts[i] views)
+CREATE OR REPLACE FUNCTION add_views(qids UUID[], counts INT[])
+RETURNS VOID AS $$
+    UPDATE public.questions q SET view_count = q.view_count + v.n
+    FROM unnest(qids, counts) AS v(id, n)
+    WHERE q.id = v.id;
+$$ LANGUAGE sql;
+
+-- Question page: the question with its answers in one call
+CREATE OR REPLACE FUNCTION get_question_detail(qid UUID)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'question', row_to_json(q),
+        'answers', (
+            SELECT COALESCE(json_agg(a ORDER BY a.created_at), '[]'::json)
+            FROM public.answers a WHERE a.question_id = qid
+        )
+    )
+    FROM (
+        SELECT id, title, content, author_id, author_username, author_university,
+               author_faculty, author_department, category, created_at, updated_at,
+               view_count, answer_count, like_count
+        FROM public.questions WHERE id = qid
+    ) q;
+$$ LANGUAGE sql STABLE;
+
+-- Toggle a like and adjust the counter atomically; returns the new liked state
+CREATE OR REPLACE FUNCTION toggle_like(qid UUID, uid UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    existed BOOLEAN;
+BEGIN
+    DELETE FROM public.question_likes
+    WHERE question_id = qid AND user_id = uid
+    RETURNING TRUE INTO existed;
+
+    IF existed THEN
+        UPDATE public.questions SET like_count = GREATEST(like_count - 1, 0) WHERE id = qid;
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO public.question_likes (question_id, user_id) VALUES (qid, uid)
+    ON CONFLICT DO NOTHING;
+    IF FOUND THEN
+        UPDATE public.questions SET like_count = like_count + 1 WHERE id = qid;
+    END IF;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =========================================
 -- Indexes for Performance
 -- =========================================
 
 -- Composite indexes for common queries
 CREATE INDEX IF NOT EXISTS idx_questions_author_created ON public.questions(author_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_author_created ON public.answers(author_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_questions_created_id ON public.questions(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_questions_category_created_id ON public.questions(category, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_answers_question_created ON public.answers(question_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_notifications_user_read_created ON public.notifications(user_id, is_read, created_at DESC);
 
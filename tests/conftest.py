@@ -0,0 +1,76 @@
+"""
+Shared pytest setup: backend modules on sys.path and a scripted DB cursor
+"""
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Placeholder settings so the backend modules import; tests never reach a server
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test.service.key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+class FakeCursor:
+    """Cursor stand-in that records statements and replays scripted results
+    
+    Each ``execute`` consumes the next result dict (``rowcount``, ``lastrowid``,
+    ``rows``). ``fail(query, args)`` may return an exception to raise instead.
+    """
+    
+    def __init__(self, *results, fail=None):
+        self.results = list(results)
+        self.fail = fail
+        self.statements = []
+        self.rowcount = 0
+        self.lastrowid = 0
+        self._rows = []
+    
+    def _run(self, query, args):
+        self.statements.append((" ".join(query.split()), args))
+        if self.fail:
+            error = self.fail(query, args)
+            if error:
+                raise error
+    
+    async def execute(self, query, args=None):
+        self._run(query, args)
+        result = self.results.pop(0) if self.results else {}
+        self.rowcount = result.get("rowcount", 0)
+        self.lastrowid = result.get("lastrowid", 0)
+        self._rows = list(result.get("rows", []))
+    
+    async def executemany(self, query, args):
+        self._run(query, list(args))
+    
+    async def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+    
+    async def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+@pytest.fixture
+def fake_cursor():
+    """The FakeCursor class, called with scripted results to build a cursor"""
+    return FakeCursor
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route server_old's connection and transaction helpers to a FakeCursor"""
+    import server_old
+    
+    def install(cursor: FakeCursor) -> FakeCursor:
+        @asynccontextmanager
+        async def connection():
+            yield cursor
+        
+        monkeypatch.setattr(server_old, "get_db_connection", connection)
+        monkeypatch.setattr(server_old, "get_db_transaction", connection)
+        return cursor
+    
+    return install
@@ -0,0 +1,105 @@
+"""
+Tests for the shared TTLCache
+"""
+import time
+
+from cache import TTLCache
+
+def test_get_returns_value_until_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10, ttl=30)
+    cache.set("a", 1)
+    
+    now[0] += 29
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_per_entry_ttl_overrides_default(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10, ttl=30)
+    cache.set("a", 1, ttl=5)
+    
+    now[0] += 5
+    assert "a" not in cache
+
+def test_pop_skips_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10, ttl=5)
+    cache.set("a", 1)
+    
+    now[0] += 5
+    assert cache.pop("a", "missing") == "missing"
+    assert len(cache) == 0
+
+def test_entries_without_ttl_never_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10)
+    cache.set("a", 1)
+    
+    now[0] += 10 ** 9
+    assert cache.get("a") == 1
+
+def test_evicts_least_recently_used_at_max_size():
+    cache = TTLCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+def test_set_replaces_and_pop_removes():
+    cache = TTLCache(10)
+    cache.set("a", 1)
+    cache.set("a", 2)
+    assert cache.get("a") == 2
+    assert len(cache) == 1
+    
+    assert cache.pop("a") == 2
+    assert cache.pop("a", "missing") == "missing"
+    
+    cache.set("b", 1)
+    cache.clear()
+    assert len(cache) == 0
+
+def test_sizeof_caps_total_size():
+    cache = TTLCache(10, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"1234")
+    cache.set("c", b"123")
+    
+    assert "a" not in cache
+    assert cache.size == 7
+    
+    # Values larger than the whole budget are not stored
+    cache.set("d", b"x" * 11)
+    assert "d" not in cache
+    assert cache.size == 7
+
+def test_size_follows_replace_pop_expiry_and_clear(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10, ttl=30, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("a", b"12")
+    assert cache.size == 2
+    
+    assert cache.pop("a") == b"12"
+    assert cache.size == 0
+    
+    cache.set("b", b"123")
+    now[0] += 30
+    assert cache.get("b") is None
+    assert cache.size == 0
+    
+    cache.set("c", b"1")
+    cache.clear()
+    assert cache.size == 0
@@ -0,0 +1,155 @@
+"""
+Tests for the Supabase Database query helpers
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from database import Database, parse_question_cursor, postgrest_quote, question_cursor
+
+class FakeQuery:
+    """PostgREST query builder stand-in that records calls and returns rows"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+    
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return call
+    
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+def make_question(i):
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "created_at": f"2024-05-01T12:00:{i:02d}+00:00",
+    }
+
+@pytest.fixture
+def questions_db():
+    """A Database whose PostgREST client answers with the given rows"""
+    def install(rows):
+        database = Database()
+        query = FakeQuery(rows)
+        database.db = SimpleNamespace(table=lambda name: query)
+        return database, query
+    return install
+
+def test_question_cursor_round_trip():
+    question = {
+        "id": "0f8fad5b-d9cb-469f-a165-70867728950e",
+        "created_at": "2024-05-01T12:00:00.123456+00:00",
+    }
+    
+    assert parse_question_cursor(question_cursor(question)) == (question["created_at"], question["id"])
+
+@pytest.mark.parametrize("cursor", [
+    "2024-05-01T12:00:00+00:00",
+    "yesterday_0f8fad5b-d9cb-469f-a165-70867728950e",
+    "2024-05-01T12:00:00+00:00_not-a-uuid",
+    "2024-05-01T12:00:00+00:00_1),id.gt.(0",
+])
+def test_parse_question_cursor_rejects_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        parse_question_cursor(cursor)
+
+def test_get_questions_breaks_created_at_ties_by_id(questions_db):
+    database, query = questions_db([make_question(i) for i in (5, 4)])
+    last = make_question(9)
+    
+    page, next_cursor = asyncio.run(database.get_questions(limit=2, cursor=question_cursor(last)))
+    
+    assert ("or_", (
+        f'created_at.lt."{last["created_at"]}",'
+        f'and(created_at.eq."{last["created_at"]}",id.lt.{last["id"]})',
+    )) in query.calls
+    assert page == [make_question(5), make_question(4)]
+    assert next_cursor is None
+
+@pytest.mark.parametrize("count, following", [(4, False), (5, True)])
+def test_get_questions_prefetches_following_page(questions_db, count, following):
+    rows = [make_question(i) for i in range(count + 10, 10, -1)]
+    database, query = questions_db(rows)
+    cursor = question_cursor(make_question(20))
+    
+    page, next_cursor = asyncio.run(database.get_questions(limit=2, cursor=cursor))
+    
+    assert ("limit", (5,)) in query.calls
+    assert page == rows[:2]
+    assert next_cursor == question_cursor(rows[1])
+    
+    query.calls.clear()
+    page, next_cursor = asyncio.run(database.get_questions(limit=2, cursor=next_cursor))
+    
+    assert query.calls == []
+    assert page == rows[2:4]
+    assert next_cursor == (question_cursor(rows[3]) if following else None)
+
+def test_get_questions_offset_page_reports_next_cursor(questions_db):
+    rows = [make_question(i) for i in (9, 8, 7)]
+    database, query = questions_db(rows)
+    
+    page, next_cursor = asyncio.run(database.get_questions(limit=2))
+    
+    assert ("range", (0, 2)) in query.calls
+    assert page == rows[:2]
+    assert next_cursor == question_cursor(rows[1])
+
+def test_postgrest_quote_escapes_quotes_and_backslashes():
+    assert postgrest_quote("ali") == '"ali"'
+    assert postgrest_quote('a"),id.neq.(x') == '"a\\"),id.neq.(x"'
+    assert postgrest_quote("a\\") == '"a\\\\"'
+
+def test_find_users_by_email_or_username_quotes_values(questions_db):
+    database, query = questions_db([{"email": "a@b.co", "username": 'x"y'}])
+    
+    users = asyncio.run(database.find_users_by_email_or_username("a@b.co", 'x"y'))
+    
+    assert users == [{"email": "a@b.co", "username": 'x"y'}]
+    assert ("or_", ('email.eq."a@b.co",username.eq."x\\"y"',)) in query.calls
+
+@pytest.fixture
+def views_db():
+    """A Database whose add_views RPC runs the given execute function"""
+    def install(execute):
+        database = Database()
+        calls = []
+        
+        def rpc(name, params):
+            calls.append((name, params))
+            return SimpleNamespace(execute=execute)
+        
+        database.db = SimpleNamespace(rpc=rpc)
+        return database, calls
+    return install
+
+def test_flush_views_writes_counts_in_one_call(views_db):
+    database, calls = views_db(lambda: None)
+    for question_id in ("q1", "q1", "q2"):
+        database.increment_question_views(question_id)
+    
+    asyncio.run(database.flush_views())
+    
+    assert calls == [("add_views", {"qids": ["q1", "q2"], "counts": [2, 1]})]
+    assert database._pending_views == {}
+
+@pytest.mark.parametrize("error", [APIError({"message": "timeout"}), asyncio.CancelledError()])
+def test_flush_views_keeps_counts_when_write_fails(views_db, error):
+    def execute():
+        raise error
+    
+    database, _ = views_db(execute)
+    database.increment_question_views("q1")
+    
+    try:
+        asyncio.run(database.flush_views())
+    except asyncio.CancelledError:
+        pass
+    
+    assert database._pending_views == {"q1": 1}
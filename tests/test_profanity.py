@@ -0,0 +1,25 @@
+"""
+Tests for the combined profanity regexes in server.py
+"""
+import pytest
+
+from server import contains_profanity
+
+@pytest.mark.parametrize("text, word", [
+    ("sikerim seni", "sikerim"),  # longest matching word is reported
+    ("Siktir git", "siktir"),
+    ("ananı s k m", "ananı"),
+    ("a.m.k", "amk"),  # spaced and punctuated spellings via the patterns
+    ("a_m_k", "amk"),
+    ("o r o s p u", "orospu"),
+])
+def test_detects_profanity(text, word):
+    assert contains_profanity(text) == (True, word)
+
+@pytest.mark.parametrize("text", [
+    "Merhaba dünya",
+    "Bu bir kitap",  # "it" only inside another word
+    "hadi gel",  # "adi" only inside another word
+])
+def test_allows_clean_text(text):
+    assert contains_profanity(text) == (False, "")
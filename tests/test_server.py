@@ -0,0 +1,13 @@
+"""
+Tests for the Supabase server's request validation
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"limit": 101}, {"offset": -1}])
+def test_get_questions_rejects_out_of_range_paging(params):
+    response = TestClient(server.app).get("/api/questions", params=params)
+    
+    assert response.status_code == 422
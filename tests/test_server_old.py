@@ -0,0 +1,215 @@
+"""
+Tests for the MySQL server's rate limit, question cursor, write buffers and
+like counting, run against a scripted cursor
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from asyncmy.errors import IntegrityError
+from fastapi import HTTPException
+
+import server_old
+
+@pytest.fixture(autouse=True)
+def reset_buffers(monkeypatch):
+    """Give every test empty module-level caches and write buffers"""
+    server_old._recent_posts.clear()
+    monkeypatch.setattr(server_old, "_pending_notifications", [])
+    monkeypatch.setattr(server_old, "_pending_views", {})
+
+def make_user(is_admin=False):
+    return server_old.User.model_construct(id="u1", username="ali", is_admin=is_admin)
+
+# Rate limit
+
+def test_rate_limit_claims_with_one_conditional_update(fake_cursor):
+    cursor = fake_cursor({"rowcount": 1})
+    now = datetime.now(timezone.utc)
+    
+    result = asyncio.run(server_old.check_rate_limit(cursor, make_user(), "last_answer_at", now))
+    
+    assert result == (True, 0)
+    assert len(cursor.statements) == 1
+    query, args = cursor.statements[0]
+    assert query.startswith("UPDATE users SET last_answer_at = %s")
+    assert "(last_question_at IS NULL OR last_question_at <= %s)" in query
+    assert "(last_answer_at IS NULL OR last_answer_at <= %s)" in query
+    threshold = now - timedelta(seconds=server_old.RATE_LIMIT_SECONDS)
+    assert args == (now, "u1", threshold, threshold)
+
+def test_rate_limit_reports_remaining_time_when_claim_fails(fake_cursor):
+    now = datetime.now(timezone.utc)
+    last_answer = (now - timedelta(seconds=30)).replace(tzinfo=None)
+    cursor = fake_cursor(
+        {"rowcount": 0},
+        {"rows": [{"last_question_at": None, "last_answer_at": last_answer}]}
+    )
+    
+    result = asyncio.run(server_old.check_rate_limit(cursor, make_user(), "last_question_at", now))
+    
+    assert result == (False, server_old.RATE_LIMIT_SECONDS - 30)
+
+def test_rate_limit_rejects_recent_local_post_without_query(fake_cursor):
+    server_old.record_post("u1")
+    cursor = fake_cursor()
+    
+    can_post, seconds = asyncio.run(
+        server_old.check_rate_limit(cursor, make_user(), "last_question_at", datetime.now(timezone.utc))
+    )
+    
+    assert not can_post
+    assert 0 < seconds <= server_old.RATE_LIMIT_SECONDS
+    assert cursor.statements == []
+
+def test_rate_limit_skips_check_for_admins(fake_cursor):
+    cursor = fake_cursor({"rowcount": 1})
+    server_old.record_post("u1")
+    
+    result = asyncio.run(
+        server_old.check_rate_limit(cursor, make_user(is_admin=True), "last_question_at", datetime.now(timezone.utc))
+    )
+    
+    assert result == (True, 0)
+    assert cursor.statements[0][0] == "UPDATE users SET last_question_at = %s WHERE id = %s"
+
+# Question cursor
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "2024-13-01T00:00:00_01HX", "_01HX"])
+def test_get_questions_rejects_malformed_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server_old.get_questions(cursor=cursor))
+    assert error.value.status_code == 400
+
+def test_get_questions_continues_after_cursor(fake_db, fake_cursor):
+    created_at = datetime(2024, 5, 1, 12, 0, 0)
+    rows = [{"id": f"q{i}", "created_at": created_at} for i in range(3)]
+    cursor = fake_db(fake_cursor({"rows": rows}))
+    page_cursor = server_old.question_cursor({"id": "q9", "created_at": created_at})
+    
+    response = asyncio.run(server_old.get_questions(limit=2, cursor=page_cursor))
+    
+    query, args = cursor.statements[0]
+    assert "(created_at < %s OR (created_at = %s AND id < %s))" in query
+    assert "ORDER BY created_at DESC, id DESC" in query
+    assert args == (created_at, created_at, "q9", 3, 0)
+    assert [q.id for q in response["questions"]] == ["q0", "q1"]
+    assert response["next_cursor"] == server_old.question_cursor(rows[1])
+    assert response["pagination"] is None
+
+# Notification buffer
+
+def queue_notifications(*user_ids):
+    for user_id in user_ids:
+        server_old.create_notification(user_id, "answer", "Başlık", "Mesaj", "u1", "ali")
+    return list(server_old._pending_notifications)
+
+def test_flush_notifications_requeues_rows_on_error(fake_db, fake_cursor):
+    rows = queue_notifications("u2", "u3")
+    fake_db(fake_cursor(fail=lambda query, args: ConnectionError("lost connection")))
+    
+    asyncio.run(server_old.flush_notifications())
+    
+    assert server_old._pending_notifications == rows
+
+def test_flush_notifications_requeues_rows_when_cancelled(fake_db, fake_cursor):
+    rows = queue_notifications("u2")
+    fake_db(fake_cursor(fail=lambda query, args: asyncio.CancelledError()))
+    
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(server_old.flush_notifications())
+    
+    assert server_old._pending_notifications == rows
+
+def test_flush_notifications_drops_only_rejected_rows(fake_db, fake_cursor):
+    rows = queue_notifications("u2", "deleted-user", "u3")
+    
+    def fail(query, args):
+        # The batch fails on the orphaned row, and so does that row alone
+        if isinstance(args, list) or args[1] == "deleted-user":
+            return IntegrityError(1452, "Cannot add or update a child row")
+    
+    cursor = fake_db(fake_cursor(fail=fail))
+    
+    asyncio.run(server_old.flush_notifications())
+    
+    assert server_old._pending_notifications == []
+    assert "INSERT INTO notifications" in cursor.statements[0][0]
+    assert [args for _, args in cursor.statements[1:]] == rows
+
+# View buffer
+
+def test_flush_views_writes_counts_in_one_batch(fake_db, fake_cursor):
+    server_old.increment_question_views("q1")
+    server_old.increment_question_views("q1")
+    server_old.increment_question_views("q2")
+    cursor = fake_db(fake_cursor())
+    
+    asyncio.run(server_old.flush_views())
+    
+    assert cursor.statements == [
+        ("UPDATE questions SET view_count = view_count + %s WHERE id = %s", [(2, "q1"), (1, "q2")])
+    ]
+    assert server_old._pending_views == {}
+
+@pytest.mark.parametrize("error", [ConnectionError("lost connection"), asyncio.CancelledError()])
+def test_flush_views_keeps_counts_when_write_fails(fake_db, fake_cursor, error):
+    server_old.increment_question_views("q1")
+    fake_db(fake_cursor(fail=lambda query, args: error))
+    
+    try:
+        asyncio.run(server_old.flush_views())
+    except asyncio.CancelledError:
+        pass
+    
+    assert server_old._pending_views == {"q1": 1}
+
+# Likes
+
+def test_like_inserts_before_counting(fake_db, fake_cursor):
+    cursor = fake_db(fake_cursor({"rowcount": 1}, {"rowcount": 1, "lastrowid": 5}))
+    
+    response = asyncio.run(server_old.like_question("q1", current_user=make_user()))
+    
+    assert response["like_count"] == 5
+    assert [query for query, _ in cursor.statements] == [
+        "INSERT IGNORE INTO question_likes (question_id, user_id) VALUES (%s, %s)",
+        "UPDATE questions SET like_count = LAST_INSERT_ID(like_count + 1) WHERE id = %s",
+    ]
+
+@pytest.mark.parametrize("question_rows, status_code", [([{"id": "q1"}], 400), ([], 404)])
+def test_like_rejected_tells_missing_question_apart(fake_db, fake_cursor, question_rows, status_code):
+    cursor = fake_db(fake_cursor({"rowcount": 0}, {"rows": question_rows}))
+    
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server_old.like_question("q1", current_user=make_user()))
+    
+    assert error.value.status_code == status_code
+    assert not any(query.startswith("UPDATE") for query, _ in cursor.statements)
+
+def test_like_without_question_row_is_404(fake_db, fake_cursor):
+    fake_db(fake_cursor({"rowcount": 1}, {"rowcount": 0}))
+    
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server_old.like_question("q1", current_user=make_user()))
+    
+    assert error.value.status_code == 404
+
+def test_unlike_returns_count_from_last_insert_id(fake_db, fake_cursor):
+    cursor = fake_db(fake_cursor({"rowcount": 1}, {"rowcount": 1, "lastrowid": 4}))
+    
+    response = asyncio.run(server_old.unlike_question("q1", current_user=make_user()))
+    
+    assert response["like_count"] == 4
+    assert cursor.statements[1][0] == (
+        "UPDATE questions SET like_count = LAST_INSERT_ID(like_count - 1) WHERE id = %s"
+    )
+
+@pytest.mark.parametrize("question_rows, status_code", [([{"id": "q1"}], 400), ([], 404)])
+def test_unlike_without_like_tells_missing_question_apart(fake_db, fake_cursor, question_rows, status_code):
+    fake_db(fake_cursor({"rowcount": 0}, {"rows": question_rows}))
+    
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server_old.unlike_question("q1", current_user=make_user()))
+    
+    assert error.value.status_code == status_code